@@ -0,0 +1,215 @@
+'''
+Local stand-in REST server used by the benchmarks
+
+Serves a single resource with a login endpoint so that benchmark testers can use the same predo
+    (login), test (create), and undo (delete) chains as a typical APITester setup:
+    POST /login          --> {'token': <token>}
+    POST /items          --> creates an item if the X-Auth-Token header is valid and the body
+                             matches the schema (201), otherwise 401/400
+    DELETE /items/<id>   --> deletes the item (200) or 404 if it does not exist
+
+Run directly to serve on a port (e.g., `python benchmarks/mock_server.py --port 8000`) or start
+    from another script with start_server/serve_in_process.
+'''
+import re
+import sys
+import json
+import time
+import argparse
+import itertools
+import threading
+import multiprocessing
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+## -----------------------------------------------------------------------------
+
+TOKEN = 'benchmark-token'
+
+_email_re = re.compile(r'[A-Za-z0-9_.+-]+@[A-Za-z0-9-]+\.[A-Za-z0-9.]+')
+_date_re = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+def check_value(value, rules):
+    '''
+    checks a value against the rules of one schema field
+
+    value (misc): value to be checked
+    rules (dict): rules of the field with the following keys (all but 'type' optional):
+        type (string): 'string', 'integer', 'float', 'boolean', 'email', 'password', 'date', or
+            'array'
+        min (number): min value (integer/float) or min length (password/array)
+        max (number): max value (integer/float)
+    '''
+    value_type = rules['type']
+    if value_type in ['string', 'email', 'password', 'date']:
+        if not isinstance(value, str) or value == '':
+            return False
+        if value_type == 'email':
+            return _email_re.fullmatch(value) is not None
+        if value_type == 'date':
+            return _date_re.fullmatch(value) is not None
+        if value_type == 'password':
+            return len(value) >= rules.get('min', 8) and any(c.isupper() for c in value) \
+                and any(c.islower() for c in value) and any(c.isdigit() for c in value)
+        return True
+    if value_type in ['integer', 'float']:
+        allowed = (int, float) if value_type == 'float' else (int,)
+        if isinstance(value, bool) or not isinstance(value, allowed):
+            return False
+        return rules.get('min', value) <= value <= rules.get('max', value)
+    if value_type == 'boolean':
+        return isinstance(value, bool)
+    if value_type == 'array':
+        return isinstance(value, list) and len(value) >= rules.get('min', 1) \
+            and all(isinstance(val, str) for val in value)
+    return True
+
+def check_body(body, schema):
+    '''
+    checks a request body against a schema, returning True if it is valid
+
+    body (dict): request body
+    schema (dict): rules (see check_value) for each field; nested fields use "." (e.g.,
+        'profile.city'), and fields with a 'required' rule of False may be left out
+    '''
+    if not isinstance(body, dict):
+        return False
+    for field, rules in schema.items():
+        value = body
+        for key in field.split('.'):
+            value = value.get(key, None) if isinstance(value, dict) else None
+        if value is None:
+            if rules.get('required', True):
+                return False
+            continue
+        if not check_value(value, rules):
+            return False
+    return True
+
+## -----------------------------------------------------------------------------
+
+def make_handler(schema, latency=0.0, payload_size=0):
+    '''
+    creates a request handler class for the mock server
+
+    schema (dict): schema that item bodies are checked against (see check_body)
+    latency (float): seconds each request waits before it is answered
+    payload_size (int): number of extra characters added to every item response (as 'padding')
+    '''
+    items = {}
+    ids = itertools.count(1)
+    lock = threading.Lock()
+    padding = 'x' * payload_size
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            return
+
+        def _send(self, status_code, obj):
+            data = json.dumps(obj).encode()
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            try:
+                return json.loads(raw) if raw else {}
+            except ValueError:
+                return None
+
+        def do_POST(self):
+            body = self._body()
+            if latency:
+                time.sleep(latency)
+            if self.path == '/login':
+                return self._send(200, {'token': TOKEN})
+            if self.path == '/items':
+                if self.headers.get('X-Auth-Token') != TOKEN:
+                    return self._send(401, {'error': 'invalid token'})
+                if not check_body(body, schema):
+                    return self._send(400, {'error': 'invalid body'})
+                with lock:
+                    item_id = str(next(ids))
+                    items[item_id] = body
+                out = dict(body, id=item_id)
+                if payload_size:
+                    out['padding'] = padding
+                return self._send(201, out)
+            return self._send(404, {'error': 'not found'})
+
+        def do_DELETE(self):
+            self._body()
+            if latency:
+                time.sleep(latency)
+            match = re.fullmatch(r'/items/(\w+)', self.path)
+            with lock:
+                if match and match.group(1) in items:
+                    del items[match.group(1)]
+                    return self._send(200, {'deleted': match.group(1)})
+            return self._send(404, {'error': 'not found'})
+
+    return Handler
+
+def start_server(schema, latency=0.0, payload_size=0, host='127.0.0.1', port=0):
+    '''
+    starts the mock server on a background thread of this process and returns the server and its
+        base url
+
+    schema (dict): schema that item bodies are checked against (see check_body)
+    latency (float): seconds each request waits before it is answered
+    payload_size (int): number of extra characters added to every item response
+    host (string): host to serve on
+    port (int): port to serve on (0 picks a free port)
+    '''
+    server = ThreadingHTTPServer((host, port), make_handler(schema, latency, payload_size))
+    server.request_queue_size = 128
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+def _serve(schema, latency, payload_size, url_queue, stop_event):
+    server, base_url = start_server(schema, latency, payload_size)
+    url_queue.put(base_url)
+    stop_event.wait()
+    server.shutdown()
+    return
+
+def serve_in_process(schema, latency=0.0, payload_size=0):
+    '''
+    starts the mock server in a separate process, so that the server's CPU time is not counted
+        as the tester's, and returns the process, its stop event, and the base url
+
+    schema (dict): schema that item bodies are checked against (see check_body)
+    latency (float): seconds each request waits before it is answered
+    payload_size (int): number of extra characters added to every item response
+    '''
+    url_queue = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve, args=(schema, latency, payload_size, url_queue, stop_event), daemon=True)
+    process.start()
+    return process, stop_event, url_queue.get(timeout=30)
+
+## -----------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='serve the benchmark mock API')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds each request waits before it is answered')
+    parser.add_argument('--payload-size', type=int, default=0, help='extra characters added to every item response')
+    args = parser.parse_args()
+
+    default_schema = {'name': {'type': 'string'}, 'age': {'type': 'integer', 'min': 0, 'max': 150}}
+    server, base_url = start_server(default_schema, args.latency, args.payload_size, port=args.port)
+    print(f'serving on {base_url}', file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,325 @@
+'''
+Benchmarks the throughput and overhead of APITester against the local mock server
+
+Runs representative tester setups (see SCENARIOS) against benchmarks/mock_server.py, which is run
+    in its own process so only the tester's CPU time is measured, and reports for each scenario
+    and run mode:
+    tests_per_sec: results added per second of wall-clock time
+    cpu_ms_per_case: CPU time of this process (the tester and its threads) per result
+    peak_memory_mb: peak memory allocated while running (measured in a separate run with
+        tracemalloc, which slows the run down)
+
+Results are written as json so runs of different versions can be compared, e.g.:
+    python benchmarks/run_benchmarks.py --output before.json
+    (change the code)
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+
+The package is imported from the src directory next to this folder so the benchmarks always
+    measure the working tree.
+'''
+import os
+import gc
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from auto_api_tester import APITester
+from auto_api_tester.utils import create_test_field
+
+from mock_server import serve_in_process
+
+## -----------------------------------------------------------------------------
+
+def _field(name, test_type, rules, acceptable_input, field_parameters=None, array_type=None):
+    required = rules.get('required', True)
+    return create_test_field(name, test_type, field_parameters or {}, required, False, not required, acceptable_input, array_type)
+
+def small_scenario():
+    '''
+    a few flat fields: string, bounded integer, and email
+    '''
+    schema = {
+        'name': {'type': 'string'},
+        'age': {'type': 'integer', 'min': 0, 'max': 150},
+        'email': {'type': 'email', 'required': False},
+    }
+    acceptable_input = {'name': 'joe', 'age': 25, 'email': 'joe@example.com'}
+    fields = [
+        _field('name', 'string', schema['name'], acceptable_input),
+        _field('age', 'integer', schema['age'], acceptable_input, {'min': 0, 'max': 150}),
+        _field('email', 'email', schema['email'], acceptable_input),
+    ]
+    return schema, acceptable_input, fields, []
+
+def many_fields_scenario(count=24):
+    '''
+    many flat string and bounded integer fields
+    '''
+    schema = {}
+    acceptable_input = {}
+    for i in range(count):
+        if i % 2 == 0:
+            schema[f'text_{i}'] = {'type': 'string'}
+            acceptable_input[f'text_{i}'] = f'value {i}'
+        else:
+            schema[f'number_{i}'] = {'type': 'integer', 'min': 0, 'max': 1000}
+            acceptable_input[f'number_{i}'] = i
+    fields = [
+        _field(key, 'string' if key.startswith('text') else 'integer', rules, acceptable_input,
+               {} if key.startswith('text') else {'min': 0, 'max': 1000})
+        for key, rules in schema.items()
+    ]
+    return schema, acceptable_input, fields, []
+
+def nested_scenario():
+    '''
+    fields nested several layers into the body, including a date and an array
+    '''
+    schema = {
+        'profile.name': {'type': 'string'},
+        'profile.birthday': {'type': 'date'},
+        'profile.address.city': {'type': 'string'},
+        'profile.address.zip': {'type': 'integer', 'min': 0, 'max': 99999},
+        'tags': {'type': 'array', 'required': False},
+    }
+    acceptable_input = {
+        'profile': {
+            'name': 'joe',
+            'birthday': '1990-01-01',
+            'address': {'city': 'springfield', 'zip': 12345, 'lines': ['1 main st', 'apt 2']},
+        },
+        'tags': ['a', 'b', 'c'],
+        'notes': {'history': [{'at': '2020-01-01', 'text': 'x' * 200} for _ in range(20)]},
+    }
+    fields = [
+        _field('profile.name', 'string', schema['profile.name'], acceptable_input),
+        _field('profile.birthday', 'date', schema['profile.birthday'], acceptable_input),
+        _field('profile.address.city', 'string', schema['profile.address.city'], acceptable_input),
+        _field('profile.address.zip', 'integer', schema['profile.address.zip'], acceptable_input, {'min': 0, 'max': 99999}),
+        _field('tags', 'array', schema['tags'], acceptable_input, array_type='string'),
+    ]
+    return schema, acceptable_input, fields, []
+
+def mixed_scenario():
+    '''
+    email, password, array, date, float, and boolean fields plus custom inputs
+    '''
+    schema = {
+        'email': {'type': 'email'},
+        'password': {'type': 'password', 'min': 8},
+        'shirts': {'type': 'array', 'required': False},
+        'start_date': {'type': 'date', 'required': False},
+        'score': {'type': 'float', 'min': 0, 'max': 10},
+        'active': {'type': 'boolean', 'required': False},
+    }
+    acceptable_input = {
+        'email': 'joe@example.com',
+        'password': 'Passw0rd!',
+        'shirts': ['white', 'black'],
+        'start_date': '2022-01-01',
+        'score': 5.5,
+        'active': True,
+    }
+    fields = [
+        _field('email', 'email', schema['email'], acceptable_input),
+        _field('password', 'password', schema['password'], acceptable_input,
+               {'min_length': 8, 'upper_case': True, 'lower_case': True, 'number': True}),
+        _field('shirts', 'array', schema['shirts'], acceptable_input, array_type='string'),
+        _field('start_date', 'date', schema['start_date'], acceptable_input),
+        _field('score', 'float', schema['score'], acceptable_input, {'min': 0, 'max': 10}),
+        _field('active', 'boolean', schema['active'], acceptable_input),
+    ]
+    custom_inputs = [
+        {'test_expected_api_result': False, 'field': 'email', 'test_name': 'email missing at sign',
+         'test_body': dict(acceptable_input, email='joe.example.com')},
+        {'test_expected_api_result': True, 'field': 'score', 'test_name': 'integer score',
+         'test_body': dict(acceptable_input, score=7)},
+    ]
+    return schema, acceptable_input, fields, custom_inputs
+
+SCENARIOS = {
+    'small': small_scenario,
+    'many_fields': many_fields_scenario,
+    'nested': nested_scenario,
+    'mixed': mixed_scenario,
+}
+
+## -----------------------------------------------------------------------------
+
+def make_tester(base_url, acceptable_input, fields, custom_inputs):
+    '''
+    creates a tester with a login predo, a create test whose token is referenced from the predo,
+        and a delete undo whose url id is referenced from the test
+    '''
+    predo = {'function': 'post', 'url': '/login', 'header': {}, 'body': {}, 'url_ids': [], 'on_success': False}
+    test = {
+        'function': 'post',
+        'url': '/items',
+        'header': {'X-Auth-Token': {'referenced_value': True, 'source': 'predo', 'component': 'response', 'location': 'token'}},
+        'body': acceptable_input,
+        'url_ids': [],
+        'final_undo': False
+    }
+    undo = {
+        'function': 'delete',
+        'url': '/items/<id>',
+        'header': {},
+        'body': {},
+        'url_ids': [{'referenced_value': True, 'source': 'test', 'component': 'response', 'location': 'id'}],
+        'on_success': True
+    }
+    return APITester(base_url, test_fields=fields, predo=predo, test=test, undo=undo,
+                     custom_inputs=custom_inputs, print_progress=False)
+
+def run_tester(tester, mode, concurrency):
+    '''
+    runs every test of the tester in the input mode ('seq', 'workers', or 'async')
+    '''
+    if mode == 'seq':
+        tester.run_all_tests()
+    elif mode == 'workers':
+        tester.run_all_tests(workers=concurrency)
+    elif mode == 'async':
+        asyncio.run(tester.run_all_tests_async(max_concurrency=concurrency))
+    else:
+        raise ValueError(f"mode must be 'seq', 'workers', or 'async' ('{mode}' provided)")
+    return
+
+def benchmark(name, mode, args):
+    '''
+    benchmarks one scenario in one run mode, returning a json serializable dict of its results
+    '''
+    schema, acceptable_input, fields, custom_inputs = SCENARIOS[name]()
+    process, stop_event, base_url = serve_in_process(schema, args.latency, args.payload_size)
+    try:
+        # warm up (connections, caches) ---------------------------------------------------------
+        tester = make_tester(base_url, acceptable_input, fields, custom_inputs)
+        run_tester(tester, mode, args.concurrency)
+        tester.close()
+
+        # timed runs ----------------------------------------------------------------------------
+        walls, cpus = [], []
+        for _ in range(args.repeat):
+            tester = make_tester(base_url, acceptable_input, fields, custom_inputs)
+            gc.collect()
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            run_tester(tester, mode, args.concurrency)
+            walls.append(time.perf_counter() - wall_start)
+            cpus.append(time.process_time() - cpu_start)
+            cases = len(tester.results)
+            passed = tester.tests_summary['passed_tests']
+            tester.close()
+
+        # memory run ----------------------------------------------------------------------------
+        peak_memory = None
+        if not args.no_memory:
+            tester = make_tester(base_url, acceptable_input, fields, custom_inputs)
+            gc.collect()
+            tracemalloc.start()
+            run_tester(tester, mode, args.concurrency)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            tester.close()
+    finally:
+        stop_event.set()
+        process.join(timeout=10)
+
+    wall = statistics.median(walls)
+    cpu = statistics.median(cpus)
+    return {
+        'scenario': name,
+        'mode': mode,
+        'cases': cases,
+        'passed_tests': passed,
+        'wall_sec': round(wall, 6),
+        'tests_per_sec': round(cases / wall, 3),
+        'cpu_ms_per_case': round(cpu / cases * 1000, 4),
+        'peak_memory_mb': round(peak_memory / 2**20, 3) if peak_memory is not None else None,
+        'wall_sec_runs': [round(val, 6) for val in walls],
+    }
+
+def package_version():
+    '''
+    version of auto-api-tester being benchmarked (from pyproject.toml next to this folder)
+    '''
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pyproject.toml')
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith('version'):
+                    return line.split('=', 1)[1].strip().strip('"')
+    except OSError:
+        pass
+    return 'unknown'
+
+def compare(results, baseline_path):
+    '''
+    prints the change of each benchmark relative to a previous results file
+    '''
+    with open(baseline_path) as f:
+        baseline = {(obj['scenario'], obj['mode']): obj for obj in json.load(f)['results']}
+    print(f'\ncompared to {baseline_path}:')
+    for obj in results:
+        old = baseline.get((obj['scenario'], obj['mode']))
+        if old is None:
+            continue
+        speed = obj['tests_per_sec'] / old['tests_per_sec']
+        cpu = obj['cpu_ms_per_case'] / old['cpu_ms_per_case']
+        print(f"  {obj['scenario']:<12} {obj['mode']:<8} tests/sec x{speed:.2f}  cpu/case x{cpu:.2f}")
+    return
+
+## -----------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark APITester against a local mock API')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f'comma separated scenarios ({", ".join(SCENARIOS)})')
+    parser.add_argument('--modes', default='seq', help="comma separated run modes ('seq', 'workers', 'async')")
+    parser.add_argument('--concurrency', type=int, default=8, help='workers/max_concurrency for the workers and async modes')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the mock server waits before answering each request')
+    parser.add_argument('--payload-size', type=int, default=0, help='extra characters added to every item response')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark (median is reported)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory run')
+    parser.add_argument('--output', default='benchmark_results.json', help='json file results are written to')
+    parser.add_argument('--compare', default=None, help='previous results file to compare against')
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenarios.split(','):
+        for mode in args.modes.split(','):
+            obj = benchmark(name, mode, args)
+            results.append(obj)
+            memory = f"{obj['peak_memory_mb']:.1f} MB" if obj['peak_memory_mb'] is not None else 'n/a'
+            print(f"{name:<12} {mode:<8} {obj['cases']:>5} cases  {obj['tests_per_sec']:>9.1f} tests/sec  "
+                  f"{obj['cpu_ms_per_case']:>7.3f} ms cpu/case  {memory} peak")
+
+    out = {
+        'package_version': package_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {
+            'latency': args.latency,
+            'payload_size': args.payload_size,
+            'concurrency': args.concurrency,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(out, f, indent=2)
+    print(f'results written to {args.output}')
+
+    if args.compare:
+        compare(results, args.compare)
+    return
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,5 @@
 from .main import APITester
+from .transport import SessionTransport, WSGITransport, ASGITransport
+from .sinks import JSONLSink
+from .tracing import ChromeTraceExporter
+from .throttle import TokenBucket, AIMDController
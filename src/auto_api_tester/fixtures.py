@@ -0,0 +1,144 @@
+import queue
+import threading
+
+## -----------------------------------------------------------------------------
+
+class FixturePool():
+    '''
+    Makes predo requests ahead of time on background threads and keeps a bounded queue of ready
+        fixtures (the predo's log entry and run_one_api outputs) so that a test can take one
+        instead of waiting on its predo request
+
+    -- input attributes --
+    tester (APITester): object whose predo is run (see APITester.make_fixture)
+    size (integer): max number of ready fixtures kept in the queue
+    workers (integer): number of predo requests made at one time
+
+    -- methods --
+    start: starts the background threads
+    allow: allows more fixtures to be made (e.g., the number of tests in a test plan)
+    take: takes the next ready fixture, waiting for one if needed
+    stop: stops the background threads, returning any fixtures that were not taken
+    '''
+    def __init__(self, tester, size=4, workers=1):
+        if size < 1:
+            raise ValueError(f'size must be at least 1 ({size} provided)')
+        if workers < 1:
+            raise ValueError(f'workers must be at least 1 ({workers} provided)')
+        self.tester = tester
+        self.size = size
+        self.workers = workers
+
+        self._fixtures = queue.Queue(maxsize=size)
+        self._condition = threading.Condition()
+        self._allowed = 0
+        self._claimed = 0
+        self._taken = 0
+        self._stopped = False
+        self._threads = []
+        return
+
+    def start(self):
+        '''
+        starts the background threads
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'auto-api-tester-fixtures-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return
+
+    def allow(self, count):
+        '''
+        allows more fixtures to be made; fixtures are only made once allowed so that no more are
+            made than will be taken
+
+        -- inputs --
+        count (integer): number of additional fixtures to allow
+
+        -- outputs --
+        None
+        '''
+        with self._condition:
+            self._allowed += count
+            self._condition.notify_all()
+        return
+
+    def _claim(self):
+        # waits until another fixture is allowed, returning False once stopped
+        with self._condition:
+            while not self._stopped and self._claimed >= self._allowed:
+                self._condition.wait()
+            if self._stopped:
+                return False
+            self._claimed += 1
+            return True
+
+    def _run(self):
+        while self._claim():
+            try:
+                fixture = self.tester.make_fixture()
+            except Exception as error:
+                fixture = {'error': error}
+            while True:
+                try:
+                    self._fixtures.put(fixture, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stopped:
+                        return
+        return
+
+    def take(self):
+        '''
+        takes the next ready fixture, waiting for one if needed (a fixture is allowed for it if
+            every allowed fixture has already been taken)
+
+        -- inputs --
+        None
+
+        -- outputs --
+        fixture (dict): fixture from APITester.make_fixture with the following structure:
+            log (dict): log entry of the predo request
+            outputs (tuple): outputs of run_one_api for the predo request
+        '''
+        with self._condition:
+            self._taken += 1
+            if self._allowed < self._taken:
+                self._allowed = self._taken
+                self._condition.notify_all()
+        fixture = self._fixtures.get()
+        if 'error' in fixture:
+            raise fixture['error']
+        return fixture
+
+    def stop(self):
+        '''
+        stops the background threads, returning any fixtures that were not taken
+
+        -- inputs --
+        None
+
+        -- outputs --
+        leftover (list): fixtures that were made but not taken (the resources their predo
+            requests created are not cleaned up)
+        '''
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._fixtures.get_nowait())
+            except queue.Empty:
+                return leftover
@@ -10,15 +10,21 @@ import copy
 import json
 import time
 import random
+import os
+import asyncio
 import requests
 import itertools
-import IPython.display as disp
+import threading
+import concurrent.futures
 
-from timer_bar import TimerBar
 
 ## -----------------------------------------------------------------------------
 
-from .utils import change_date, test_boundary, check_field, update_field_value, get_field_value, create_test_field, update_url_id, find_vals, find_hb_vals,find_ids_vals, result_template
+from .utils import LogEntry, status_matches, percentile, change_date, test_boundary, check_field, get_field_value, create_test_field, update_url_id, find_vals, result_template, summarize_response, compile_template, render_template, lengthen_value, shorten_value, case_template, compile_field
+from .transport import SessionTransport, request_method
+from .progress import ProgressRenderer, new_progress_bar
+from .fixtures import FixturePool
+from .throttle import TokenBucket, AIMDController
 
 ## -----------------------------------------------------------------------------
 
@@ -51,22 +57,102 @@ class APITester():
     print_json (bool): print json result of each API request
     print_progress (bool): print progress bar when steps are updated
     display_refresh (bool): for progress bar, refresh the print display instead of printing to new line
+    headless (bool): print progress as plain text lines without timer_bar or IPython (e.g., in CI or
+        other scripts run outside a notebook), which are then never imported; default is True if
+        print_progress is False, otherwise False
     min_print_wait (float): amount of time between progress prints; will wait until that time has passed
         to print a new line
+    transport (object): object used to send every predo, test, and undo request; must have a
+        request(method, url, headers=None, json=None) method that returns a response with
+        status_code and json(); default is a SessionTransport built from pool_size and
+        default_headers; WSGITransport and ASGITransport call a Python web app in-process instead
+        of over the network
+    pool_size (integer): max number of pooled keep-alive connections per host for the default
+        transport; should be at least the max_concurrency used with run_all_tests_async
+    default_headers (dict): headers sent with every request by the default transport
+    keep_responses (string): which full request responses are kept in results: 'none' (default)
+        replaces every predo/test/undo response with a ResponseSummary (status code, elapsed time,
+        and truncated body), 'failures' keeps full responses only for results that were not as
+        expected, and 'all' keeps every full response
+    response_body_limit (int): max number of characters of the response body kept in a
+        ResponseSummary or printed with print_json (None to keep all)
+    response_json (string): which decoded response json is kept in results (predo_json,
+        test_json, undo_json): 'failures' (default) keeps it only for requests that failed (or
+        tests that were not as expected), 'all' keeps it for every request, and 'none' keeps
+        none; responses are only decoded when something reads them (a referenced value,
+        print_json, or a result), so by default the json of requests that went as expected is
+        None in results unless 'all' is set, and most response bodies are never parsed
+    response_size_limit (int): max number of bytes of each response body that are read (by the
+        default transport) or decoded; a larger response is decoded as an error dict (e.g., a
+        test's result is kept but a value referenced from it cannot be found); default None reads
+        and decodes every body in full
+    sinks (list): objects each result is written to as soon as it is added (e.g., JSONLSink); each
+        must have write(result), flush(), and close() methods
+    hooks (dict): functions to run at points of every run, with an event name as each key and a
+        function (or list of functions) as each value; each function is passed a single dict with
+        'event', 'thread' (id of the running thread), and the following by event:
+        before_plan: plan (name of the plan; field name, '**General**', 'custom_inputs', or 'all'),
+            start (time.perf_counter() value)
+        after_plan: plan, start, elapsed (seconds), cases (list of test cases)
+        before_api: api ('predo', 'test', or 'undo'), field, test_name, api_input, start
+        after_api: api, field, test_name, api_input, start (of the last attempt), elapsed, wait
+            (seconds spent before the last attempt), ttfb, success, response
+        after_result: field, test_name, result, time (time.perf_counter() value)
+        api hooks may be run from several threads at once (run_all_tests_async, workers) and are
+        not run in the processes of run_all_tests_sharded; see ChromeTraceExporter for an example
+    keep_results (bool): whether results are also kept in the results attribute; set to False
+        for long runs whose results are written to sinks so memory use does not grow with the
+        number of tests (failed_predo/test/undo still keep the results that failed)
+    timeout (float or tuple): seconds to wait for each request to connect and for its response,
+        or a (connect, read) tuple; default None waits forever; can be set for predo, test, or
+        undo alone with their 'timeout' key
+    retries (integer): number of times a request is retried after a transport error (e.g., a
+        connection reset or timeout) or a 429/503 response, waiting a jittered exponential
+        backoff between attempts; can be set for predo, test, or undo alone with their 'retries'
+        key; requests that still fail with a transport error are recorded as failed instead of
+        stopping the run
+    retry_backoff (float): seconds of backoff before the first retry, doubled for each retry after
+        that (up to _retry_backoff_max); each wait is a random amount up to the backoff, or the
+        response's Retry-After seconds if longer
+    deadline (float): seconds each run (run_all_tests, run_all_tests_async, or
+        run_all_tests_sharded) may take; once it has passed, the planned test cases that have not
+        started are added to results as not run (status _not_run_status; they are neither passed
+        nor failed, so they are left out of tests_summary, tests_summary_by_field, and
+        failed_test) and request timeouts are capped at the time left; default None has no
+        deadline
+    rate_limit (float or TokenBucket): max number of requests sent per second (on average, with
+        short bursts), shared by every request of the tester (including those of
+        run_all_tests_async and workers); default None has no limit
+    concurrency_controller (AIMDController): limits the number of requests in flight at one time,
+        backing off when responses are throttled (429), server errors (5xx), transport errors, or
+        latency spikes and ramping back up as they succeed; only limits runs that send requests
+        at one time (run_all_tests_async up to max_concurrency or workers); with rate_limit or
+        concurrency_controller set, a predo or test response with a status code in _retry_status
+        (429/503) that is still returned once retries are used up is recorded as throttled (e.g.,
+        'test not completed (throttled: 429)') rather than as a test result; tests that were not
+        completed (throttled or a transport error) or not run because their predo was
+        throttled are neither passed nor failed, so they are counted as 'throttled' in
+        result_counts, tests_summary, and tests_summary_by_field and left out of failed_test
 
     -- input attributes that should have no inputs* --
     * these are objects and arrays that will carry over from one instance of an object to the next
         unless they are setup to be input variables that have default/blank values if not provided;
         please do not provide values for these attributes
-    tests_summary (dict): counts of passed tests and total tests for each field
+    tests_summary (dict): counts of passed tests, total tests, and throttled tests for each field
     log (dict): a log of the previously run predo, test, undo that for each of the three api
-        requests should contain body, header, url_ids, url, expected_result, api_result,
-        field_index, and test_index
+        requests should contain body, header, url_ids, url, expected_result, response (json of the
+        response, decoded when first read; see LogEntry), api_result, field_index, test_index, time
+        (seconds taken by the request, or by its last attempt if retried), wait (seconds spent
+        waiting for the rate_limit, concurrency_controller, and earlier attempts and backoff of
+        retries before that), and ttfb (seconds until the response headers were received, if
+        provided by the response); referenced values are resolved against the log without
+        copying it, so it (and the explicit values it shares with predo/test/undo) should be
+        treated as read-only
     results (list): list of results of tests with form dictated by result_template function
     current_result (dict): object containing all the results that are currently being processed;
         resets at the end of each full test, but is handy in case there is an error in one part
         of the test, you can still see the result_template of what you have so far
-    tests_summary_by_field (list): list of dict of counts of passed tests and total tests for each field
+    tests_summary_by_field (list): list of dict of counts of passed, total, and throttled tests for each field
     failed_predo (list): list of failed predo requests, in the results form
     failed_test (list): list of failed test requests, in the results form
     failed_undo (list): list of failed undo requests, in the results form
@@ -75,7 +161,8 @@ class APITester():
         has the following form:
         name (string): name of progress bar (shouldn't change from "l1")
         active (bool): whether the progress bar should be printed
-        progress_bar (TimerBar): object to contain information about progress
+        progress_bar (TimerBar): object to contain information about progress (HeadlessBar if
+            headless)
         current_step (integer): current step in the process
     l2_progress_bar (dict): object to store info on progress bar to show progress through next 
         level of hierarchy of tests (e.g, progress through each of fields for field tests, etc.)
@@ -95,13 +182,38 @@ class APITester():
     total_predo_issues (integer): running count of failed attempts at predo
     total_test_issues (integer): running count of unexpected results
     total_undo_issues (integer): running count of failed attempts at undo
+    result_timings (list): (field, test_name, test_source, predo_time, test_time, undo_time) of
+        each result added, used by latency_summary
+    result_counts (dict): running counts of passed tests, total tests, and throttled tests (not
+        included in total tests) of the results added for each field ({<field>: {'passed_tests':
+        <int>, 'total_tests': <int>, 'throttled': <int>}}), kept up to date by add_result
+    deadline_reached (bool): whether the last run reached its deadline (see deadline)
+    load_report (dict): report of the last run_load (see run_load)
+    unused_fixtures (list): log entries of the predo requests the fixture pool made in the last
+        run that no test took (e.g., once the run deadline was reached); the resources they
+        created were not cleaned up (see predo 'pool')
     
 
     -- class constants
     _general_test_field (string): name to put in 'field' attribute for output for non-field
         specific tests
     _log_init (dict): initial value for log
-    _l1_init (dict): initial value for l1_progress_bar
+    _keep_responses_options (list): permissible values of keep_responses
+    _response_json_options (list): permissible values of response_json
+    _cache_invalidate_status (list): default status codes of test/undo responses that clear the
+        cached predo
+    _hook_events (list): events functions can be registered to with hooks/add_hook
+    _retry_status (list): status codes of responses that are retried (see retries)
+    _retry_backoff_max (float): max seconds of backoff between retries
+    _not_run_status (string): status of the predo, test, and undo of test cases not run because the
+        run deadline was reached
+    _throttled_statuses (tuple): starts of the test statuses of test cases that are counted as
+        throttled instead of passed or failed
+    _counts_init (dict): initial value for each field of result_counts
+    _transport_errors (tuple): exceptions of requests that are retried (see retries) and recorded
+        as failed requests if they still occur
+    _l1_init (dict): initial value for l1_progress_bar (progress_bar is created for each object;
+        see new_progress_bar_dict)
     _l2_init (dict): initial value for l2_progress_bar
     _l3_init (dict): initial value for l3_progress_bar
 
@@ -112,11 +224,58 @@ class APITester():
     add_issue: adds an issue count to various counters as needed
     add_result: adds results to the result attribute of the object
     update_progress_bars: updates progress bar and prints all active progress bars
+    render_progress_bars: prints all active progress bars
+    new_progress_bar_dict: creates a new progress bar dict from one of the class constant initial values
+    start_progress: starts printing progress bars from a background thread
+    stop_progress: stops printing progress bars from a background thread
     run_one_api: runs one api (predo, test, undo)
     run_one_test: runs the predo, test, and undo and logs the results
+    run_test_chain: runs the predo, test, and undo of one test case against an input log
     run_general_tests: runs all standard general tests
     run_one_field: runs all standard field-specific tests for one specific field
     run_all_tests: runs general tests, all field tests, custom tests then sythesizes results
+    run_all_tests_async: same as run_all_tests, but runs the predo/test/undo chains concurrently
+    run_all_tests_sharded: same as run_all_tests, but splits the predo/test/undo chains across processes
+    run_load: runs the acceptable base case (and a weighted mix of custom_inputs tests) over and
+        over for a length of time and reports throughput, error rate, and latency over time
+    load_cases: finds the test cases run_load runs and their weights
+    load_summary: summarizes the chains run by run_load
+    tester_definition: creates a picklable dict of the inputs needed to create a copy of the object
+    build_plan: generates the test plan of general, field, and custom inputs tests without running it
+    general_plan: generates the test plan of all standard general tests
+    field_plan: generates the test plan of all standard field-specific tests for one field
+    custom_inputs_plan: generates the test plan of all tests specified by custom_inputs
+    run_plan: runs the test cases of a test plan one at a time
+    build_test_body: builds the test body of a test case
+    add_summary: adds a tests_summary_by_field entry for the field of a 'summary' test case
+    run_fields_parallel: runs the field-specific tests of several fields at one time
+    run_custom_tests: runs all tests specified by the custom_tests attribute
+    summarize_results: sythesizes results into tests_summary and failed_predo/test/undo
+    compile_requests: compiles the header, body, and url_ids of predo, test, and undo into templates
+    request_template: finds the compiled template of the header, body, or url_ids of a request
+    latency_summary: summarizes the time taken by the predo, test, or undo api requests by field,
+        test name, or test source
+    retain_responses: replaces the responses of a result with a ResponseSummary based on keep_responses
+    decode_response: decodes the json of a response, or a dict notifying the user of why it could not be
+    print_response: prints the json of a response, truncated to response_body_limit characters
+    flush_sinks: writes any results buffered by the sinks
+    close_sinks: writes any results buffered by the sinks and closes them
+    collect_plan: generates every test case of a test plan, running plan hooks
+    add_hook: registers a function to be run at one point of every run
+    run_hooks: runs every function registered for an event
+    cached_predo: finds the cached predo for a field
+    cache_predo: caches a successful predo so it can be reused by later tests
+    invalidate_predo_cache: clears the cached predo so the next test runs the predo again
+    run_probe: runs the undo's state probe and returns the state it found
+    make_fixture: runs the predo against a fresh log to make a fixture for the fixture pool
+    start_fixture_pool: starts a FixturePool that makes predo requests ahead of time
+    stop_fixture_pool: stops the FixturePool started by start_fixture_pool
+    send_request: sends one api request through the transport, retrying it if needed
+    retry_delay: finds the number of seconds to wait before retrying a request
+    request_timeout: caps a request timeout at the time left before the run deadline
+    start_deadline: starts the deadline of a run
+    deadline_remaining: finds the number of seconds left before the run deadline
+    close: closes the transport and any pooled connections
     clear_results: clears/resets pertinent variables; likely used before running all tests
     rerun_rests: reruns tests, clearing results and other pertinent fields, then runs all tests
     run_custom_inputs: runs all tests specified by the custom_inputs attribute
@@ -163,8 +322,11 @@ class APITester():
         created by the test or revert documents to their original value. Either way, specific
         test documents should be used for these APIs so as to not make unwanted changes to your
         database. The general form of these tests should be as follows: {
-            function (requests function): type of API call to be used (e.g., requests.get,
-                requests.post, requests.patch, etc.)
+            function (string or requests function): http method of the API call (e.g., 'get',
+                'post', 'patch', etc.) or the matching requests function (e.g., requests.get,
+                requests.post, requests.patch, etc.); either way the request is sent through the
+                tester's transport (any other function is called directly in the same way as
+                requests.post)
             url (string): API specific url that will be added to the base url,
             header* (dict): all the keys with explicit values or referenced values from the log of
                 APIs that are run (self.log); see below for further notes 
@@ -174,6 +336,36 @@ class APITester():
                 log of APIs that are run (self.log); see below for further notes
             on_success (bool): (predo and undo only) whether the predo or undo request should be
                 made only if the previous test was successful (True) or regardless (False)
+            cache (float or string): (predo only, optional) reuse a successful predo (its log entry
+                and response) for the tests that follow instead of making the request again,
+                either for this many seconds or, with 'session', until it is invalidated; suited
+                to predo requests that only set something up that tests do not change (e.g., a
+                login that returns a token); a predo that uses <field> is cached for each field
+            cache_invalidate_status (list): (predo only, optional) status codes of test or undo
+                responses that clear the cached predo (default [401, 403]); see also
+                invalidate_predo_cache
+            pool (integer): (predo only, optional) make predo requests ahead of time on background
+                threads, keeping up to this many ready (see FixturePool), so each test takes a
+                fixture (the predo's log entry and response) instead of waiting on its predo;
+                suited to predo requests that create a fresh resource for each test (e.g., a
+                document to delete or update); the predo cannot use <field> or reference the test
+                or undo, and cannot be combined with cache; with on_success set, whether a test
+                runs the predo depends on the test before it, so run_all_tests only makes each
+                fixture once a test takes it; fixtures that are made but never taken are kept in
+                unused_fixtures
+            pool_workers (integer): (predo only, optional) number of predo requests the pool makes
+                at one time (default 1)
+            timeout (float or tuple): (optional) timeout of this request in place of the tester's
+                timeout
+            retries (integer): (optional) retries of this request in place of the tester's retries
+            skip_status (list): (undo only, optional) status codes (e.g., 422) or status classes
+                (e.g., '4xx') of test responses for which the undo is not run, since a rejected
+                test request changed nothing that needs undoing; only matters when on_success is
+                False
+            probe (dict): (undo only, optional) cheap request (with the same keys as predo, test,
+                and undo: function, url, header, body, and url_ids) made before and after each test
+                whose undo would run; the undo is not run if the probe finds the same status code
+                and response both times
             delete_field_test (bool): (test only) whether to run a test to see if fields can be
                 deleted with the input delete_value
             final_undo (bool): (test only) whether to run a test with a known success once more 
@@ -253,9 +445,20 @@ class APITester():
     '''
     _general_test_field = '**General**'
     _log_init = {'predo': {}, 'test': {}, 'undo': {}}
-    _l1_init = {'name': 'l1', 'active': True, 'progress_bar': TimerBar(steps=0, print_after=True), 'current_step': -1, 'suffix': ' {} / {}', 'issues': 0}
-    _l2_init = {'name': 'l2', 'active': False, 'progress_bar': TimerBar(steps=0, print_after=True), 'current_step': -1, 'suffix': ' {} / {}', 'issues': 0}
-    _l3_init = {'name': 'l3', 'active': False, 'progress_bar': TimerBar(steps=0, print_after=True), 'current_step': -1, 'suffix': ' {} / {} tests', 'issues': 0}
+    _keep_responses_options = ['none', 'failures', 'all']
+    _response_json_options = ['none', 'failures', 'all']
+    _cache_invalidate_status = [401, 403]
+    _hook_events = ['before_plan', 'after_plan', 'before_api', 'after_api', 'after_result']
+    _retry_status = [429, 503]
+    _retry_backoff_max = 30
+    _not_run_status = 'not run (run deadline reached)'
+    _throttled_statuses = ('test not completed', 'not run because predo request was throttled')
+    _counts_init = {'passed_tests': 0, 'total_tests': 0, 'throttled': 0}
+    _transport_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError,
+                         TimeoutError, concurrent.futures.TimeoutError)
+    _l1_init = {'name': 'l1', 'active': True, 'progress_bar': None, 'current_step': -1, 'suffix': ' {} / {}', 'issues': 0}
+    _l2_init = {'name': 'l2', 'active': False, 'progress_bar': None, 'current_step': -1, 'suffix': ' {} / {}', 'issues': 0}
+    _l3_init = {'name': 'l3', 'active': False, 'progress_bar': None, 'current_step': -1, 'suffix': ' {} / {} tests', 'issues': 0}
 
     def __init__(self,
                  base_url,
@@ -271,6 +474,7 @@ class APITester():
                  print_json = False,
                  print_progress = True,
                  display_refresh = True,
+                 headless = None,
                  min_print_wait = 0.04,
                  tests_summary = None,
                  log = None,
@@ -283,6 +487,22 @@ class APITester():
                  l1_progress_bar = None,
                  l2_progress_bar = None,
                  l3_progress_bar = None,
+                 transport = None,
+                 pool_size = 10,
+                 default_headers = None,
+                 keep_responses = 'none',
+                 response_body_limit = 1000,
+                 response_json = 'failures',
+                 response_size_limit = None,
+                 sinks = None,
+                 keep_results = True,
+                 hooks = None,
+                 timeout = None,
+                 retries = 0,
+                 retry_backoff = 0.5,
+                 deadline = None,
+                 rate_limit = None,
+                 concurrency_controller = None,
                 ):
         
         self.base_url = base_url
@@ -299,12 +519,15 @@ class APITester():
         self.print_progress = print_progress
         self.display_refresh = display_refresh
         self.min_print_wait = min_print_wait
+        self.headless = headless if headless is not None else not print_progress
+        self.transport = transport if transport is not None else SessionTransport(pool_size=pool_size, default_headers=default_headers,
+                                                                                  max_body_size=response_size_limit)
 
         self.tests_summary = tests_summary if tests_summary is not None else {}
         self.log = log if log is not None else copy.deepcopy(self._log_init)
-        self.l1_progress_bar = l1_progress_bar if l1_progress_bar is not None else copy.deepcopy(self._l1_init)
-        self.l2_progress_bar = l2_progress_bar if l2_progress_bar is not None else copy.deepcopy(self._l2_init)
-        self.l3_progress_bar = l3_progress_bar if l3_progress_bar is not None else copy.deepcopy(self._l3_init)
+        self.l1_progress_bar = l1_progress_bar if l1_progress_bar is not None else self.new_progress_bar_dict(self._l1_init)
+        self.l2_progress_bar = l2_progress_bar if l2_progress_bar is not None else self.new_progress_bar_dict(self._l2_init)
+        self.l3_progress_bar = l3_progress_bar if l3_progress_bar is not None else self.new_progress_bar_dict(self._l3_init)
         
         self.results = results if results is not None else []
         self.current_result = current_result if current_result is not None else {}
@@ -320,6 +543,39 @@ class APITester():
         self.total_custom_test_issues = 0
 
         self.last_print = time.perf_counter()
+        self._progress_renderer = None
+
+        if keep_responses not in self._keep_responses_options:
+            raise ValueError(f"keep_responses must be one of {self._keep_responses_options} ('{keep_responses}' provided)")
+        self.keep_responses = keep_responses
+        self.response_body_limit = response_body_limit
+        if response_json not in self._response_json_options:
+            raise ValueError(f"response_json must be one of {self._response_json_options} ('{response_json}' provided)")
+        self.response_json = response_json
+        self.response_size_limit = response_size_limit
+        self.sinks = sinks if sinks is not None else []
+        self.keep_results = keep_results
+        self.hooks = {event: [] for event in self._hook_events}
+        for event, functions in (hooks if hooks is not None else {}).items():
+            for function in (functions if isinstance(functions, list) else [functions]):
+                self.add_hook(event, function)
+        self.result_counts = {}
+        self.result_timings = []
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.deadline = deadline
+        self.deadline_reached = False
+        self.load_report = {}
+        self.unused_fixtures = []
+        self.rate_limiter = rate_limit if rate_limit is None or isinstance(rate_limit, TokenBucket) else TokenBucket(rate_limit)
+        self.concurrency_controller = concurrency_controller
+
+        self._deadline_at = None
+        self._lock = threading.RLock()
+        self._templates = {}
+        self._predo_cache = {}
+        self._fixture_pool = None
         return
     
     def update_fields(self, obj, field, new_value=None, delete=False, match_fields=True):
@@ -336,7 +592,8 @@ class APITester():
         match_fields (bool): if True, will run update_fields on fields specified in
                              self.matching fields to match the target field
         
-        Notes: uses general update_field function and associated inputs, but adds match_fields
+        Notes: uses general update_field_value function and associated inputs (so only the layers
+        along each changed field are copied and the rest of obj is shared), but adds match_fields
         ability so that if there are any other fields than the one directly being changed that
         should match that change (e.g., password + passwordConfirmation, etc.) that that value
         will be changed as well. Setting match_fields to False will forego that process and only
@@ -346,13 +603,15 @@ class APITester():
         -- outputs --
         obj (dict): updated object 
         '''
-        obj = update_field_value(obj, field, new_value=new_value, delete=delete)
-        
+        fields = [field]
         for matches in self.matching_fields:
             if field in matches and match_fields:
                 for val in matches:
                     if val != field:
-                        obj = update_field_value(obj, val, new_value=new_value, delete=delete)
+                        fields.append(val)
+
+        for val in fields:
+            obj = compile_field(val).updated(obj, new_value=new_value, delete=delete)
         return obj
 
     def add_issue(self, issue_tracker):
@@ -382,7 +641,9 @@ class APITester():
     
     def add_result(self, result):
         '''
-        adds results to the result attribute of the object
+        adds results to the result attribute of the object (if keep_results) and writes them to
+            every sink, updating result_counts, result_timings, and failed_predo/test/undo as each
+            is added
         
         -- inputs --
         result (list or dict): the result(s) to be added, can either be added one at a time with a
@@ -394,13 +655,50 @@ class APITester():
         None
         '''
         if isinstance(result, list):
-            self.results.extend(result)
+            results = result
         elif isinstance(result, dict):
-            self.results.append(result)
+            results = [result]
+        else:
+            results = []
+
+        for obj in results:
+            # tests not run because of the run deadline or not completed because of throttling are
+            # neither passed nor failed
+            test_status = obj.get('test_status') or ''
+            throttled = test_status.startswith(self._throttled_statuses)
+            not_run = throttled or test_status == self._not_run_status
+            counts = self.result_counts.setdefault(obj['field'], dict(self._counts_init))
+            if throttled:
+                counts['throttled'] += 1
+            elif not not_run:
+                counts['passed_tests'] += 1 if obj['expected_result'] else 0
+                counts['total_tests'] += 1
+            if self._request_failed(obj, 'predo'):
+                self.failed_predo.append(obj)
+            if not obj['expected_result'] and not not_run:
+                self.failed_test.append(obj)
+            if self._request_failed(obj, 'undo'):
+                self.failed_undo.append(obj)
+            self.result_timings.append((obj['field'], obj['test_name'], obj.get('test_source'),
+                obj.get('predo_time'), obj.get('test_time'), obj.get('undo_time')))
+            for sink in self.sinks:
+                sink.write(obj)
+            if self.hooks['after_result']:
+                self.run_hooks('after_result', {'field': obj['field'], 'test_name': obj['test_name'], 'result': obj,
+                                                'time': time.perf_counter()})
+        if self.keep_results:
+            self.results.extend(results)
 
         self.current_result = {}
         return
 
+    def _request_failed(self, result, api):
+        # custom tests may only provide the response, not its status code
+        status_code = result.get(f'{api}_status_code')
+        if status_code is None:
+            status_code = getattr(result.get(f'{api}_response'), 'status_code', None)
+        return status_code is not None and status_code // 100 != 2
+
     def update_progress_bars(self, value_update={}, suffix_update={}, print_progress_override=None):
         '''
         updates progress bar and prints all active progress bars
@@ -424,16 +722,10 @@ class APITester():
         -- outputs --
         None
         '''
-        if print_progress_override:
-            original_pp = self.print_progress
-            self.print_progress = print_progress_override
+        print_progress = print_progress_override if print_progress_override else self.print_progress
 
         bars = [self.l1_progress_bar, self.l2_progress_bar, self.l3_progress_bar]
 
-        if self.display_refresh and self.print_progress:
-            time.sleep(max(0, self.min_print_wait - (time.perf_counter() - self.last_print)))
-            disp.clear_output(wait=True)
-
         for bar in bars:
             if bar['active']:
                 bar_name = bar['name']
@@ -446,22 +738,106 @@ class APITester():
                     if suffix.count('{}') != 2:
                         raise ValueError(f"suffix_update for {bar_name} does not has {suffix.count('{}')}x'{{}}' not 2x'{{}}'")
                     bar['suffix'] = suffix
+
+        # while tests are running, the progress renderer prints the bars from its own thread
+        if self._progress_renderer is not None:
+            self._progress_renderer.dirty = True
+        elif print_progress:
+            if self.display_refresh:
+                time.sleep(max(0, self.min_print_wait - (time.perf_counter() - self.last_print)))
+            self.render_progress_bars()
+        return
+
+    def render_progress_bars(self):
+        '''
+        prints all active progress bars (refreshing the display if display_refresh and not
+            headless)
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        if self.display_refresh and not self.headless:
+            from IPython.display import clear_output
+            clear_output(wait=True)
+
+        for bar in [self.l1_progress_bar, self.l2_progress_bar, self.l3_progress_bar]:
+            if bar['active']:
                 bar['progress_bar'].suffix_update(bar['suffix'].format(bar['current_step']+1, bar['progress_bar'].steps) + f" ({bar['issues']} issues)")
-                if self.print_progress:
-                    print(bar['progress_bar'].text_at_step(bar['current_step']))
-                    self.last_print = time.perf_counter()
+                print(bar['progress_bar'].text_at_step(bar['current_step']))
+        self.last_print = time.perf_counter()
+        return
+
+    def new_progress_bar_dict(self, bar_init):
+        '''
+        creates a new progress bar dict from one of the class constant initial values, with a
+            TimerBar (or a HeadlessBar if headless) as its progress_bar
+
+        -- inputs --
+        bar_init (dict): initial value of the progress bar dict (_l1_init, _l2_init, or _l3_init)
+
+        -- outputs --
+        bar (dict): progress bar dict
+        '''
+        bar = dict(bar_init)
+        bar['progress_bar'] = new_progress_bar(self.headless)
+        return bar
+
+    def start_progress(self):
+        '''
+        starts a ProgressRenderer that prints the progress bars from a background thread every
+            min_print_wait seconds (if print_progress), so that updating progress while tests run
+            never waits on printing; used by run_all_tests, run_all_tests_async, and
+            run_all_tests_sharded
+
+        -- inputs --
+        None
 
-        if print_progress_override:
-            self.print_progress = original_pp
+        -- outputs --
+        None
+        '''
+        self.stop_progress()
+        if self.print_progress:
+            self._progress_renderer = ProgressRenderer(self, self.min_print_wait)
+            self._progress_renderer.start()
+        return
+
+    def stop_progress(self):
+        '''
+        stops the ProgressRenderer started by start_progress, printing any progress that has not
+            been printed yet
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        if self._progress_renderer is not None:
+            renderer = self._progress_renderer
+            self._progress_renderer = None
+            renderer.stop()
         return
     
-    def run_one_api(self, api, test_field):
+    def run_one_api(self, api, test_field, api_obj=None, log=None, log_indices=None, test_name=None, decode=True):
         '''
         runs one api (predo, test, undo)
         
         -- inputs --
         api (string): which api object is being tested ('predo', 'test', or 'undo')
         test_field (string): field currently being tested
+        api_obj (dict): api definition to use in place of self.predo/self.test/self.undo (e.g., a
+            test definition with header, body, or url_ids overrides); default is the attribute
+            matching api
+        log (dict): log to resolve referenced values against and record the request in; default
+            is self.log (chains run concurrently each pass their own log)
+        log_indices (tuple): (field_index, test_index) to record in the log; default is taken from
+            the l2 and l3 progress bars
+        test_name (string): name of the test the request is part of (passed to hooks)
+        decode (bool): whether the response is decoded now for out_json; otherwise it is only
+            decoded when the log entry's response is first read (see LogEntry)
 
         -- outputs --
         api_input (dict): inputs for the api request with the following structure:
@@ -469,23 +845,24 @@ class APITester():
             header (dict): object sent as header
             body (dict): object sent as body
         success (bool): whether the api call was success (200s response)
-        out_json (dict): json of the response of the api (or dict notifying user of server error)
+        out_json (dict): json of the response of the api (or dict notifying user of server error);
+            None if decode is False
         response (obj): request response object in its entirety
         '''
         
-        if api == 'predo':
-            api_obj = self.predo
-        elif api == 'test':
-            api_obj = self.test
-        elif api == 'undo':
-            api_obj = self.undo
-        else:
+        if api not in ['predo', 'test', 'undo']:
             raise ValueError(f'api input must be "predo", "test", or "undo"; "{api}" not acceptable')
-
-        input_url_ids = find_ids_vals(api_obj, self.log, test_field)
+        if api_obj is None:
+            api_obj = getattr(self, api)
+        if log is None:
+            log = self.log
+        if log_indices is None:
+            log_indices = (self.l2_progress_bar['current_step'] + 1, self.l3_progress_bar['current_step'] + 1)
+
+        input_url_ids = render_template(self.request_template(api, api_obj, 'url_ids'), log, test_field)
         input_url = update_url_id(self.base_url+api_obj['url'], input_url_ids)
-        input_header = find_hb_vals(api_obj, 'header', self.log, test_field, self.delete_value)
-        input_body = find_hb_vals(api_obj, 'body', self.log, test_field, self.delete_value)
+        input_header = render_template(self.request_template(api, api_obj, 'header'), log, test_field, self.delete_value)
+        input_body = render_template(self.request_template(api, api_obj, 'body'), log, test_field, self.delete_value)
 
         api_input = {
             'url': input_url,
@@ -493,45 +870,499 @@ class APITester():
             'body': input_body
             }
 
-        response = api_obj['function'](api_input['url'],headers=api_input['header'],json=api_input['body'])
-        success = (response.status_code // 100 == 2)
-        server_error =  (response.status_code // 100) % 10 == 5
-        url_not_found = response.status_code == 404
+        if self.hooks['before_api']:
+            self.run_hooks('before_api', {'api': api, 'field': test_field, 'test_name': test_name, 'api_input': api_input,
+                                          'start': time.perf_counter()})
+        request_start = time.perf_counter()
+        timing = {}
+        try:
+            # the undo cleans up after the test, so it is not cut short by the run deadline
+            response = self.send_request(api_obj, api_input, cap_timeout=(api != 'undo'), timing=timing)
+        except self._transport_errors as error:
+            # recorded as a failed request (with no response) so one unreachable request does not stop the run
+            response = None
+            transport_error = error
+        # time only covers the attempt that was returned; waits for throttling and retries are kept apart
+        attempt_start = timing.get('start', request_start)
+        request_time = time.perf_counter() - attempt_start
+        request_wait = attempt_start - request_start
+        request_ttfb = response.elapsed.total_seconds() if hasattr(getattr(response, 'elapsed', None), 'total_seconds') else None
+        status_code = response.status_code if response is not None else None
+        success = status_code is not None and (status_code // 100 == 2)
         
-        if server_error:
-            out_json = {'error': 'server error: see server console for more details'}
-        elif url_not_found:
-            out_json = {'error': f"url error: url not found ({api_input['url']})"}
+        if response is None:
+            out_json = {'error': f'transport error: {transport_error!r}'}
+            decode_json = None
         else:
-            try:
-                out_json = response.json()
-            except:
-                out_json = {'error': f"unknown error: response status code = {response.status_code}"}
+            out_json = None
+            decode_json = lambda: self.decode_response(response, api_input['url'])
         
         if self.print_status:
             if success:
                 print(f'{api} request successful')
+            elif response is None:
+                print(f"{api} request failed with {out_json['error']}")
             else:
                 print(f'{api} request failed with status code: {response.status_code}')
-
-        if self.print_json and success:
-            pretty_json = json.dumps(out_json, indent=4, sort_keys=True)
-            print(pretty_json)
         
-        self.log[api] = {
+        log[api] = LogEntry({
             'url': api_input['url'],
             'header': api_input['header'],
             'body': api_input['body'],
             'response': out_json,
             'url_ids': input_url_ids,
             'api_result': success,
-            'field_index': self.l2_progress_bar['current_step'] + 1,
-            'test_index': self.l3_progress_bar['current_step'] + 1
-        }
+            'field_index': log_indices[0],
+            'test_index': log_indices[1],
+            'time': request_time,
+            'wait': request_wait,
+            'ttfb': request_ttfb
+        }, decode=decode_json)
+
+        if self.print_json and success:
+            self.print_response(response, log[api]['response'])
+        if decode:
+            out_json = log[api]['response']
+
+        if api != 'predo' and len(self._predo_cache) > 0 and \
+                status_code in self.predo.get('cache_invalidate_status', self._cache_invalidate_status):
+            self.invalidate_predo_cache()
+
+        if self.hooks['after_api']:
+            self.run_hooks('after_api', {'api': api, 'field': test_field, 'test_name': test_name, 'api_input': api_input,
+                                         'start': attempt_start, 'elapsed': request_time, 'wait': request_wait, 'ttfb': request_ttfb,
+                                         'success': success, 'response': response})
         
         return api_input, success, out_json, response
+
+    def decode_response(self, response, url):
+        '''
+        decodes the json of a response, or a dict notifying the user of why it could not be
+
+        -- inputs --
+        response (obj): request response object
+        url (string): url the request was made to
+
+        -- outputs --
+        out_json (dict): json of the response (or dict notifying user of server error)
+        '''
+        status_code = response.status_code
+        if self._throttled(response):
+            return {'error': f'throttled: response status code = {status_code}'}
+        if (status_code // 100) % 10 == 5:
+            return {'error': 'server error: see server console for more details'}
+        if status_code == 404:
+            return {'error': f"url error: url not found ({url})"}
+        if getattr(response, 'body_truncated', False) or \
+                (self.response_size_limit is not None and len(response.content) > self.response_size_limit):
+            return {'error': f'response too large: body is over response_size_limit ({self.response_size_limit} bytes)'}
+        try:
+            return response.json()
+        except:
+            return {'error': f"unknown error: response status code = {response.status_code}"}
+
+    def print_response(self, response, out_json):
+        '''
+        prints the json of a response (see print_json); bodies longer than response_body_limit
+            characters are printed as truncated text instead of being formatted
+
+        -- inputs --
+        response (obj): request response object
+        out_json (dict): json of the response from decode_response
+
+        -- outputs --
+        None
+        '''
+        limit = self.response_body_limit
+        if limit is not None and len(response.content) > limit:
+            print(f'{summarize_response(response, limit).text}... ({len(response.content)} bytes)')
+        else:
+            print(json.dumps(out_json, indent=4, sort_keys=True))
+        return
+
+    def _result_json(self, log, api, failed):
+        # json of a request's response kept in the result (see response_json)
+        if self.response_json == 'all' or (self.response_json == 'failures' and failed):
+            return log[api]['response']
+        return None
     
-    def run_one_test(self, test_name, error, field, test_expected_api_result, test_header=None, test_body=None, test_url_ids=None, test_source='Not Provided'):
+    def compile_requests(self):
+        '''
+        compiles the header, body, and url_ids of predo, test, and undo into templates (see
+            compile_template) that are reused by every request of a run; referenced values are
+            checked here so that any issues are raised before any requests are made
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        self._templates = {}
+        for api in ['predo', 'test', 'undo']:
+            api_obj = getattr(self, api)
+            if api_obj is None:
+                continue
+            for focus in ['header', 'body', 'url_ids']:
+                self.request_template(api, api_obj, focus)
+        if self.undo and self.undo.get('probe'):
+            for focus in ['header', 'body', 'url_ids']:
+                self._probe_template(focus)
+        return
+
+    def request_template(self, api, api_obj, focus):
+        '''
+        finds the compiled template of the header, body, or url_ids of a request; templates of
+            self.predo/self.test/self.undo are compiled once and reused for as long as the
+            header, body, or url_ids object is not replaced, while overrides (e.g., test_header of
+            a test case) are compiled each time
+
+        -- inputs --
+        api (string): which api object is being run ('predo', 'test', or 'undo')
+        api_obj (dict): api definition being run
+        focus (string): 'header', 'body', or 'url_ids'
+
+        -- outputs --
+        template (dict): template from compile_template
+        '''
+        request_part = api_obj[focus]
+        cached = self._templates.get((api, focus))
+        if cached is not None and cached[0] is request_part:
+            return cached[1]
+
+        template = compile_template(request_part, f'in {api} {focus}')
+        base_obj = getattr(self, api)
+        if base_obj is not None and base_obj[focus] is request_part:
+            self._templates[(api, focus)] = (request_part, template)
+        return template
+
+    def _probe_template(self, focus):
+        # compiled template of the undo probe's header, body, or url_ids (see request_template)
+        request_part = self.undo['probe'][focus]
+        cached = self._templates.get(('probe', focus))
+        if cached is None or cached[0] is not request_part:
+            cached = (request_part, compile_template(request_part, f'in undo probe {focus}'))
+            self._templates[('probe', focus)] = cached
+        return cached[1]
+
+    def run_probe(self, test_field, log):
+        '''
+        runs the undo's state probe (see undo 'probe' in the class notes) and returns the state it
+            found; the probe is not recorded in the log
+
+        -- inputs --
+        test_field (string): field currently being tested
+        log (dict): log to resolve referenced values against
+
+        -- outputs --
+        state (tuple): (status code, response json or text if not json) of the probe response; a
+            probe that fails with a transport error returns a state that is not equal to any
+            other state, so the undo is still run
+        '''
+        probe = self.undo['probe']
+        input_url_ids = render_template(self._probe_template('url_ids'), log, test_field)
+        api_input = {
+            'url': update_url_id(self.base_url+probe['url'], input_url_ids),
+            'header': render_template(self._probe_template('header'), log, test_field, self.delete_value),
+            'body': render_template(self._probe_template('body'), log, test_field, self.delete_value)
+            }
+        try:
+            response = self.send_request(probe, api_input)
+        except self._transport_errors:
+            return None, object()
+        try:
+            content = response.json()
+        except:
+            content = getattr(response, 'text', None)
+        return response.status_code, content
+
+    def _predo_cache_ttl(self):
+        # seconds a cached predo can be reused for (None if the predo is not cached)
+        cache = self.predo.get('cache') if self.predo else None
+        if cache is None or cache is False:
+            return None
+        if cache == 'session':
+            return float('inf')
+        if isinstance(cache, bool) or not isinstance(cache, (int, float)) or cache <= 0:
+            raise ValueError(f"predo['cache'] must be a positive number of seconds or 'session' ({cache!r} provided)")
+        return cache
+
+    def _predo_cache_key(self, field):
+        # a predo that uses the test field (as a key or location) is cached for each field
+        for focus in ['header', 'body', 'url_ids']:
+            for key, ref, value in self.request_template('predo', self.predo, focus)['slots']:
+                if key == '<field>' or (ref is not None and ref['location'] == '<field>'):
+                    return field
+        return None
+
+    def cached_predo(self, field):
+        '''
+        finds the cached predo for a field (see predo 'cache' in the class notes)
+
+        -- inputs --
+        field (string): field currently being tested
+
+        -- outputs --
+        cached (dict): None if there is no cached predo or it has expired, otherwise a dict with
+            the following structure:
+            log (dict): log entry of the predo request
+            outputs (tuple): outputs of run_one_api for the predo request
+            time (float): time.perf_counter() value when the predo request was made
+        '''
+        ttl = self._predo_cache_ttl()
+        if ttl is None:
+            return None
+        key = self._predo_cache_key(field)
+        with self._lock:
+            cached = self._predo_cache.get(key)
+            if cached is not None and time.perf_counter() - cached['time'] > ttl:
+                del self._predo_cache[key]
+                cached = None
+        return cached
+
+    def cache_predo(self, field, log_entry, outputs):
+        '''
+        caches a successful predo so it can be reused by later tests (if predo 'cache' is set)
+
+        -- inputs --
+        field (string): field currently being tested
+        log_entry (dict): log entry of the predo request
+        outputs (tuple): outputs of run_one_api for the predo request
+
+        -- outputs --
+        None
+        '''
+        if self._predo_cache_ttl() is None:
+            return
+        key = self._predo_cache_key(field)
+        with self._lock:
+            self._predo_cache[key] = {'log': log_entry, 'outputs': outputs, 'time': time.perf_counter()}
+        return
+
+    def invalidate_predo_cache(self):
+        '''
+        clears the cached predo so the next test runs the predo again; run automatically when a
+            test or undo response has a status code in predo['cache_invalidate_status']
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        with self._lock:
+            self._predo_cache.clear()
+        return
+
+    def make_fixture(self):
+        '''
+        runs the predo against a fresh log to make a fixture for the fixture pool (see predo 'pool'
+            in the class notes)
+
+        -- inputs --
+        None
+
+        -- outputs --
+        fixture (dict): dict with the following structure:
+            log (dict): log entry of the predo request
+            outputs (tuple): outputs of run_one_api for the predo request
+        '''
+        log = copy.deepcopy(self._log_init)
+        outputs = self.run_one_api('predo', self._general_test_field, log=log, log_indices=(-1, -1), decode=False)
+        return {'log': log['predo'], 'outputs': outputs}
+
+    def start_fixture_pool(self):
+        '''
+        starts a FixturePool that makes predo requests ahead of time if predo['pool'] is set; used
+            by run_all_tests, run_all_tests_async, and run_all_tests_sharded
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        self.stop_fixture_pool()
+        self.unused_fixtures = []
+        if not self.predo or not self.predo.get('pool'):
+            return
+        if self._predo_cache_ttl() is not None:
+            raise ValueError("predo 'pool' and 'cache' cannot both be set")
+        if self._predo_cache_key(self._general_test_field) is not None:
+            raise ValueError("predo 'pool' cannot be used with a predo that uses <field>")
+        self._fixture_pool = FixturePool(self, self.predo['pool'], self.predo.get('pool_workers', 1))
+        self._fixture_pool.start()
+        return
+
+    def stop_fixture_pool(self):
+        '''
+        stops the FixturePool started by start_fixture_pool, adding the log entries of fixtures that
+            were made but not taken to unused_fixtures
+
+        -- inputs --
+        None
+
+        -- outputs --
+        leftover (list): fixtures that were made but not taken
+        '''
+        if self._fixture_pool is None:
+            return []
+        pool = self._fixture_pool
+        self._fixture_pool = None
+        leftover = pool.stop()
+        self.unused_fixtures.extend([fixture['log'] for fixture in leftover])
+        return leftover
+
+    def send_request(self, api_obj, api_input, cap_timeout=True, timing=None):
+        '''
+        sends one api request through the transport
+
+        -- inputs --
+        api_obj (dict): predo, test, or undo definition being run
+        api_input (dict): inputs for the api request with the following structure:
+            url (string): url used to make the call
+            header (dict): object sent as header
+            body (dict): object sent as body
+        cap_timeout (bool): whether the timeout (and any wait to retry) is capped at the time left
+            before the run deadline
+        timing (dict): dict to record 'start' in, the time.perf_counter() value when the last
+            attempt was sent (after any waits for the rate_limit, concurrency_controller, and
+            retries)
+
+        -- outputs --
+        response (obj): request response object in its entirety
+
+        Notes: the request is retried (see retries) after a transport error or a response with a
+        status code in _retry_status, and raises the transport error if it still occurs once the
+        retries are used up (or the run deadline would pass while waiting to retry); each attempt
+        waits for the rate_limit and concurrency_controller (if set)
+        '''
+        timeout = api_obj.get('timeout', self.timeout)
+        retries = api_obj.get('retries', self.retries)
+        attempt = 0
+        while True:
+            kwargs = {}
+            request_timeout = self.request_timeout(timeout) if cap_timeout else timeout
+            if request_timeout is not None:
+                kwargs['timeout'] = request_timeout
+            response = None
+            ticket = self.concurrency_controller.acquire() if self.concurrency_controller is not None else None
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            attempt_start = time.perf_counter()
+            if timing is not None:
+                timing['start'] = attempt_start
+            try:
+                method = request_method(api_obj['function'])
+                if method is None:
+                    response = api_obj['function'](api_input['url'], headers=api_input['header'], json=api_input['body'], **kwargs)
+                else:
+                    response = self.transport.request(method, api_input['url'], headers=api_input['header'], json=api_input['body'], **kwargs)
+            except self._transport_errors:
+                if attempt >= retries:
+                    raise
+            finally:
+                if ticket is not None:
+                    self.concurrency_controller.release(ticket, getattr(response, 'status_code', None), time.perf_counter() - attempt_start)
+            if response is not None and (response.status_code not in self._retry_status or attempt >= retries):
+                return response
+
+            delay = self.retry_delay(attempt, response)
+            remaining = self.deadline_remaining() if cap_timeout else None
+            if remaining is not None and delay >= remaining:
+                if response is not None:
+                    return response
+                raise TimeoutError(f"run deadline would pass before retrying {api_input['url']}")
+            time.sleep(delay)
+            attempt += 1
+
+    def _final_undo_needed(self, log):
+        # test['final_undo'] only reruns a test request that was made and failed (a chain stopped
+        # before its test leaves log['test'] empty), never once the run deadline is reached
+        if not (self.test and self.test['final_undo']) or log['test'].get('api_result') is not False:
+            return False
+        remaining = self.deadline_remaining()
+        if remaining is not None and remaining <= 0:
+            self.deadline_reached = True
+            return False
+        return True
+
+    def _throttled(self, response):
+        # with throttling set up, a 429/503 still returned after any retries is not a test result
+        return (self.rate_limiter is not None or self.concurrency_controller is not None) and \
+            response is not None and response.status_code in self._retry_status
+
+    def retry_delay(self, attempt, response=None):
+        '''
+        finds the number of seconds to wait before retrying a request: a random amount up to an
+            exponential backoff (full jitter), or the response's Retry-After seconds if longer
+
+        -- inputs --
+        attempt (int): number of retries made so far
+        response (obj): response that is being retried (None after a transport error)
+
+        -- outputs --
+        delay (float): seconds to wait
+        '''
+        delay = random.uniform(0, min(self._retry_backoff_max, self.retry_backoff * 2 ** attempt))
+        retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+        try:
+            delay = max(delay, min(self._retry_backoff_max, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    def request_timeout(self, timeout):
+        '''
+        caps a request timeout at the time left before the run deadline (if any)
+
+        -- inputs --
+        timeout (float or tuple): seconds, or a (connect, read) tuple, to wait for the request
+            (None to wait forever)
+
+        -- outputs --
+        timeout (float or tuple): timeout of the request (None to wait forever)
+        '''
+        remaining = self.deadline_remaining()
+        if remaining is None or remaining <= 0:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple([min(val, remaining) if val is not None else remaining for val in timeout])
+        return min(timeout, remaining)
+
+    def start_deadline(self):
+        '''
+        starts the deadline of a run (see deadline); used by run_all_tests, run_all_tests_async,
+            and run_all_tests_sharded
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        self._deadline_at = time.time() + self.deadline if self.deadline is not None else None
+        self.deadline_reached = False
+        return
+
+    def deadline_remaining(self):
+        '''
+        finds the number of seconds left before the run deadline
+
+        -- inputs --
+        None
+
+        -- outputs --
+        remaining (float): seconds left (negative once the deadline has passed); None if the run
+            has no deadline
+        '''
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - time.time()
+
+    def run_one_test(self, test_name, error, field, test_expected_api_result, test_header=None, test_body=None, test_url_ids=None, test_source='Not Provided', test_url=None):
         '''
         runs the predo, test, and undo and logs the results
 
@@ -547,96 +1378,208 @@ class APITester():
             test API request
         test_url_ids (list): array of url_ids that if provided will be set to test['url_ids'] before
             running test API request
+        test_source (string): which method produced this test
+        test_url (string): url that if provided will be used in place of test['url'] for the test
+            API request
 
         -- outputs --
         expected_result (bool): whether the api produced the expected result (success or failure)
         '''
+        case = case_template(
+            test_name=test_name,
+            error=error,
+            field=field,
+            test_expected_api_result=test_expected_api_result,
+            test_header=test_header,
+            test_body=test_body,
+            test_url_ids=test_url_ids,
+            test_url=test_url,
+            test_source=test_source,
+            log_indices=(self.l2_progress_bar['current_step'] + 1, self.l3_progress_bar['current_step'] + 1)
+        )
+
         first_field = (self.l2_progress_bar['current_step']+1 == 0) if self.l2_progress_bar['active'] else (self.l3_progress_bar['current_step']+1 == 0)
         
+        run_predo = False
+        predo_status = None
+        if self.predo:
+            # a log without a test (e.g., a field worker's fresh log) has nothing to reuse
+            if first_field or not self.predo['on_success'] or 'api_result' not in self.log['test']:
+                run_predo = True
+            elif self.predo['on_success'] and self.log['test']['api_result']:
+                run_predo = True
+            if not run_predo:
+                predo_status = f"last test api request not successful (self.log.test." \
+                               f"api_result={self.log['test']['api_result']})"
+
+        result = self.run_test_chain(case, self.log, run_predo=run_predo, predo_status=predo_status, track_current=True)
+        
+        self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
+
+        self.add_result(result)
+        
+        return result['expected_result']
+
+    def run_test_chain(self, case, log, run_predo=True, predo_status=None, track_current=False):
+        '''
+        runs the predo, test, and undo of one test case against the input log and returns the
+            result without adding it to self.results
+
+        -- inputs --
+        case (dict): test case in the form of the case_template function
+        log (dict): log the predo, test, and undo are resolved against and recorded in; should be
+            self.log when run sequentially or a fresh copy of self._log_init for an independent chain
+        run_predo (bool): whether the predo should be run (if there is a predo)
+        predo_status (string): predo status to record when the predo is not run
+        track_current (bool): whether self.current_result should be updated as each step completes
+
+        -- outputs --
+        result (dict): result of the chain in the form of the result_template function
+        '''
+        test_name = case['test_name']
+        error = case['error']
+        field = case['field']
+        test_expected_api_result = case['test_expected_api_result']
+        test_source = case['test_source']
+        log_indices = case['log_indices']
+
+        remaining = self.deadline_remaining()
+        if remaining is not None and remaining <= 0:
+            self.deadline_reached = True
+            log['test'] = {}
+            return result_template(
+                False,
+                test_expected_api_result,
+                test_name,
+                error,
+                field,
+                predo_status=self._not_run_status,
+                test_status=self._not_run_status,
+                undo_status=self._not_run_status,
+                test_source=test_source
+            )
+
         predo_input = None
-        predo_status = 'No predo as part of this tester'
+        predo_status = predo_status if predo_status is not None else 'No predo as part of this tester'
         predo_response = None
         predo_json = None
-        if self.predo:
-            run_predo = False
-            if first_field or not self.predo['on_success']:
-                run_predo = True
-            elif self.predo['on_success'] and 'api_result' in self.log['test']:
-                if self.log['test']['api_result']:
-                    run_predo = True
-            if run_predo:
-                predo_input, predo_success, predo_json, predo_response = self.run_one_api('predo', field)
-                if predo_success:
-                    predo_status = 'predo successful'
-                else:
+        predo_ran = False
+        cached_predo = self.cached_predo(field) if (self.predo and run_predo) else None
+        if cached_predo is not None:
+            log['predo'] = cached_predo['log']
+            predo_input, predo_success, predo_json, predo_response = cached_predo['outputs']
+            predo_status = 'predo reused from cache'
+        elif self.predo and run_predo and self._fixture_pool is not None:
+            fixture = self._fixture_pool.take()
+            log['predo'] = fixture['log'].updated(field_index=log_indices[0], test_index=log_indices[1])
+            predo_input, predo_success, predo_json, predo_response = fixture['outputs']
+            predo_ran = True
+            if predo_success:
+                predo_status = 'predo successful (fixture pool)'
+            else:
+                with self._lock:
                     self.add_issue(self.total_predo_issues)
-                    predo_status = 'predo attemped and failed'
+                predo_status = 'predo attemped and failed (fixture pool)'
+        elif self.predo and run_predo:
+            predo_input, predo_success, predo_json, predo_response = self.run_one_api('predo', field, log=log, log_indices=log_indices, test_name=test_name, decode=False)
+            predo_ran = True
+            if predo_success:
+                predo_status = 'predo successful'
+                self.cache_predo(field, log['predo'], (predo_input, predo_success, predo_json, predo_response))
             else:
-                if not 'api_result' in self.log['test']:
-                    predo_status = f"'api_result' not in self.log['test']"
-                else:
-                    predo_status = f"last test api request not successful (self.log.test." \
-                                   f"api_result={self.log['test']['api_result']})"
-        self.current_result= result_template(
-            test_expected_api_result,
-            test_name,
-            field,
-            predo_input,
-            predo_status,
-            predo_response,
-            predo_json,
-            test_source
-        )
+                with self._lock:
+                    self.add_issue(self.total_predo_issues)
+                predo_status = 'predo attemped and failed'
+        if predo_input is not None:
+            predo_json = self._result_json(log, 'predo', not predo_success)
+        if track_current:
+            self.current_result= result_template(
+                test_expected_api_result,
+                test_name,
+                field,
+                predo_input,
+                predo_status,
+                predo_response,
+                predo_json,
+                test_source
+            )
         
+        # the test and undo are not run after a predo that was not completed (transport error) or
+        # once the run deadline is reached
+        stop_status = None
+        if predo_ran and predo_response is None:
+            stop_status = 'not run because predo request was not completed'
+        elif predo_ran and self._throttled(predo_response):
+            stop_status = f'not run because predo request was throttled ({predo_response.status_code})'
+        elif predo_ran and self.deadline_remaining() is not None and self.deadline_remaining() <= 0:
+            self.deadline_reached = True
+            stop_status = self._not_run_status
+
+        # state before the test, compared after the test to see whether the undo is needed
+        probe_state = None
+        if self.undo and self.undo.get('probe') and stop_status is None:
+            probe_state = self.run_probe(field, log)
+
         test_input = None
         test_status = 'No test as part of this tester'
         test_response = None
         test_json = None
         test_success = False
-        if self.test:
-            if test_header is not None:
-                original_header = self.test['header']
-                self.test['header'] = test_header
-            if test_body is not None:
-                original_body = self.test['body']
-                self.test['body'] = test_body
-            if test_url_ids is not None:
-                original_url_ids = self.test['url_ids']
-                self.test['url_ids'] = test_url_ids
-            test_input, test_success, test_json, test_response = self.run_one_api('test', field)
+        expected_result = False
+        if self.test and stop_status is not None:
+            test_status = stop_status
+            log['test'] = {}
+        elif self.test:
+            test_obj = dict(self.test)
+            overrides = {
+                'header': case['test_header'],
+                'body': self.build_test_body(case),
+                'url_ids': case['test_url_ids'],
+                'url': case['test_url']
+            }
+            for key, value in overrides.items():
+                if value is not None:
+                    test_obj[key] = value
+            test_input, test_success, test_json, test_response = self.run_one_api('test', field, api_obj=test_obj, log=log, log_indices=log_indices, test_name=test_name, decode=False)
             
             # process result for output
-            expected_result = (test_expected_api_result == test_success)
-
-            if expected_result:
+            expected_result = (test_expected_api_result == test_success) and test_response is not None \
+                and not self._throttled(test_response)
+            test_json = self._result_json(log, 'test', not expected_result)
+
+            if test_response is None:
+                with self._lock:
+                    self.add_issue(self.total_test_issues)
+                test_status = f"test not completed ({log['test']['response']['error']})"
+            elif self._throttled(test_response):
+                with self._lock:
+                    self.add_issue(self.total_test_issues)
+                test_status = f'test not completed (throttled: {test_response.status_code})'
+            elif expected_result:
                 test_status = 'expected results achieved'
             else:
-                self.add_issue(self.total_test_issues)
+                with self._lock:
+                    self.add_issue(self.total_test_issues)
                 test_status = f'test ran, but expected results not achieve ({test_success} ' \
                                 f'occured but expected {test_expected_api_result})'
-            if test_header is not None:
-                self.test['header'] = original_header
-            if test_body is not None:
-                self.test['body'] = original_body
-            if test_url_ids is not None:
-                self.test['url_ids'] = original_url_ids
                 
-        self.current_result= result_template(
-            expected_result,
-            test_expected_api_result,
-            test_name,
-            error,
-            field,
-            predo_input,
-            predo_status,
-            predo_response,
-            predo_json,
-            test_input,
-            test_status,
-            test_response,
-            test_json,
-            test_source
-        )
+        if track_current:
+            self.current_result= result_template(
+                expected_result,
+                test_expected_api_result,
+                test_name,
+                error,
+                field,
+                predo_input,
+                predo_status,
+                predo_response,
+                predo_json,
+                test_input,
+                test_status,
+                test_response,
+                test_json,
+                test_source
+            )
         
         # run if undo['on_success'] is false or if the undo was successful
         undo_input = None
@@ -644,17 +1587,26 @@ class APITester():
         undo_response = None
         undo_json = None
         if self.undo:
-            if (self.undo['on_success'] and test_success) or not self.undo['on_success']:
-                undo_input, undo_success, undo_json, undo_response = self.run_one_api('undo', field)
+            test_status_code = getattr(test_response, 'status_code', None)
+            if stop_status is not None:
+                undo_status = stop_status
+            elif self.undo['on_success'] and not test_success:
+                undo_status = 'undo not run because test api request was not successful'
+            elif status_matches(test_status_code, self.undo.get('skip_status', [])):
+                undo_status = f'undo not run because test api request was rejected ({test_status_code})'
+            elif probe_state is not None and self.run_probe(field, log) == probe_state:
+                undo_status = 'undo not run because probe found no change'
+            else:
+                undo_input, undo_success, undo_json, undo_response = self.run_one_api('undo', field, log=log, log_indices=log_indices, test_name=test_name, decode=False)
+                undo_json = self._result_json(log, 'undo', not undo_success)
                 if undo_success:
                     undo_status = 'undo successful'
                 else:
-                    self.add_issue(self.total_undo_issues)
+                    with self._lock:
+                        self.add_issue(self.total_undo_issues)
                     undo_status = 'undo not successful'
-            else:
-                undo_status = 'undo not run because test api request was not successful'
 
-        self.current_result= result_template(
+        result = result_template(
             expected_result,
             test_expected_api_result,
             test_name,
@@ -672,44 +1624,105 @@ class APITester():
             undo_status,
             undo_response,
             undo_json,
-            test_source
+            test_source,
+            predo_status_code=getattr(predo_response, 'status_code', None),
+            test_status_code=getattr(test_response, 'status_code', None),
+            undo_status_code=getattr(undo_response, 'status_code', None),
+            predo_time=log['predo']['time'] if predo_ran else None,
+            test_time=log['test']['time'] if test_input is not None else None,
+            undo_time=log['undo']['time'] if undo_input is not None else None,
+            predo_ttfb=log['predo']['ttfb'] if predo_ran else None,
+            test_ttfb=log['test']['ttfb'] if test_input is not None else None,
+            undo_ttfb=log['undo']['ttfb'] if undo_input is not None else None,
+            predo_wait=log['predo']['wait'] if predo_ran else None,
+            test_wait=log['test']['wait'] if test_input is not None else None,
+            undo_wait=log['undo']['wait'] if undo_input is not None else None
         )
-        
-        self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
+        self.retain_responses(result)
+        if track_current:
+            self.current_result = result
 
+        return result
 
-        self.add_result(result_template(
-            expected_result,
-            test_expected_api_result,
-            test_name,
-            error,
-            field,
-            predo_input,
-            predo_status,
-            predo_response,
-            predo_json,
-            test_input,
-            test_status,
-            test_response,
-            test_json,
-            undo_input,
-            undo_status,
-            undo_response,
-            undo_json,
-            test_source
-        ))
-        
-        return expected_result
+    def latency_summary(self, by='field', api='test', percentiles=(50, 95, 99)):
+        '''
+        summarizes the time taken by the predo, test, or undo api requests of the results added so
+            far, grouped by field, test name, or test source
+
+        -- inputs --
+        by (string): 'field', 'test_name', or 'test_source' to group by; None puts every request
+            in one group named 'all'
+        api (string): which api request to summarize ('predo', 'test', or 'undo')
+        percentiles (tuple): percentiles (0-100) to find for each group
+
+        -- outputs --
+        summary (dict): for each group, a dict with the count of requests, each percentile (e.g.,
+            'p50', 'p95', 'p99'), and the max, in seconds
+        '''
+        if by not in [None, 'field', 'test_name', 'test_source']:
+            raise ValueError(f"by must be 'field', 'test_name', 'test_source', or None ('{by}' provided)")
+        if api not in ['predo', 'test', 'undo']:
+            raise ValueError(f'api input must be "predo", "test", or "undo"; "{api}" not acceptable')
+        group_index = {'field': 0, 'test_name': 1, 'test_source': 2}.get(by)
+        time_index = {'predo': 3, 'test': 4, 'undo': 5}[api]
+
+        groups = {}
+        for timing in self.result_timings:
+            if timing[time_index] is None:
+                continue
+            group = timing[group_index] if by is not None else 'all'
+            groups.setdefault(group, []).append(timing[time_index])
+
+        summary = {}
+        for group, values in groups.items():
+            values.sort()
+            summary[group] = {'count': len(values)}
+            for pct in percentiles:
+                summary[group][f'p{pct:g}'] = percentile(values, pct)
+            summary[group]['max'] = values[-1]
+        return summary
+
+    def retain_responses(self, result):
+        '''
+        replaces the predo, test, and undo responses of a result with a ResponseSummary (status
+            code, elapsed time, and body truncated to response_body_limit characters) unless
+            keep_responses calls for the full responses to be kept
+
+        -- inputs --
+        result (dict): result in the form of the result_template function; changed in place
+
+        -- outputs --
+        None
+        '''
+        if self.keep_responses == 'all' or (self.keep_responses == 'failures' and not result['expected_result']):
+            return
+        for api in ['predo', 'test', 'undo']:
+            result[f'{api}_response'] = summarize_response(result[f'{api}_response'], self.response_body_limit)
+        return
     
     def run_general_tests(self, placeholder='<id>'):
         '''
-        runs all standard general tests
+        runs all standard general tests (see general_plan)
 
         -- inputs --
         placeholder (string): the string in urls that will be replaced by ids
 
         -- outputs --
         None
+        '''
+        self.run_plan(self.general_plan(placeholder), self._general_test_field)
+        return
+
+    def general_plan(self, placeholder='<id>'):
+        '''
+        generates the test plan of all standard general tests without running them
+
+        -- inputs --
+        placeholder (string): the string in urls that will be replaced by ids
+
+        -- outputs --
+        plan (generator): test cases in the order they should be run (see build_plan), ending with
+            a 'summary' case for the general tests
 
         -- test hierarchy --
         I. General
@@ -731,52 +1744,37 @@ class APITester():
         test_header = copy.deepcopy(self.test['header']) #find_hb_vals(self.test, 'header', self.log, self._general_test_field)
         test_url_ids = copy.deepcopy(self.test['url_ids']) #find_ids_vals(self.test, self.log, self._general_test_field)
 
-        # Count expected tests ---------------------------------------------------------------------
-
-        expected_tests = 1 #if any(test_input) else 0 # 1 base test
-        expected_tests += 4 if 'X-Auth-Token' in test_header else 0
-        expected_tests += len(test_url_ids)*3
-
-        self.l3_progress_bar['progress_bar'].steps = expected_tests
+        test_index = 0
         
-        # Define helper functions to run test ------------------------------------------------------
-
-        def lengthen(val):
-            return val + 'a'
-        def shorten(val):
-            return val[-1]
-
-        def run_general_test(test_name,
-                              error,
-                              test_expected_api_result,
-                              new_value='!!not input!!',
-                              match_fields=True,
-                              test_header=None,
-                              test_url_ids=None):
-            if new_value == '!!not input!!':
-                test_body = test_input
-            elif new_value == '!!delete!!':
-                test_body = self.update_fields(test_input, test_field, delete=True, match_fields=match_fields)
-            else:
-                test_body = self.update_fields(test_input, test_field, new_value=new_value, match_fields=match_fields)
-            expected_result = self.run_one_test(
+        # Define helper functions to create test cases ---------------------------------------------
+
+        def general_case(test_name,
+                         error,
+                         test_expected_api_result,
+                         test_header=None,
+                         test_url_ids=None,
+                         test_url=None):
+            nonlocal test_index
+            test_index += 1
+            # headers and ids are reused between cases, so each case gets its own copy
+            return case_template(
                 test_name=test_name,
                 error=error,
                 field=test_field,
                 test_expected_api_result=test_expected_api_result,
-                test_header=test_header,
-                test_body=test_body,
-                test_url_ids=test_url_ids,
-                test_source=self._general_test_field
+                test_header=copy.deepcopy(test_header),
+                test_body=test_input,
+                test_url_ids=copy.deepcopy(test_url_ids),
+                test_url=test_url,
+                test_source=self._general_test_field,
+                log_indices=(0, test_index-1)
             )
-
-            return
         
         # General tests ---------------------------------------------------------------------------
 
         # IA. test base case
 ##        if any(test_input):
-        run_general_test(test_name='acceptable base case',
+        yield general_case(test_name='acceptable base case',
                         error='base case not accepted',
                         test_expected_api_result=True)
 
@@ -792,14 +1790,14 @@ class APITester():
             # IIA. no token
             ## TO DO some issue here, things aren't working
             del temp_header['X-Auth-Token']
-            run_general_test('no token (delete)',
+            yield general_case('no token (delete)',
                              'success despite no token',
                              False,
                              test_header=temp_header)
 
             # IIB. none value given for token
             temp_header['X-Auth-Token'] = None
-            run_general_test('none value for token',
+            yield general_case('none value for token',
                              'success despite none value for token',
                              False,
                              test_header=temp_header)
@@ -807,20 +1805,20 @@ class APITester():
             temp_header = copy.deepcopy(test_header)
             # IIC. shortened token
             if isinstance(test_header['X-Auth-Token'], dict):
-                temp_header['X-Auth-Token']['function'] = shorten
+                temp_header['X-Auth-Token']['function'] = shorten_value
             else: 
                 temp_header['X-Auth-Token'] = original_token[:-1]
-            run_general_test('shortened token',
+            yield general_case('shortened token',
                              'success despite token being partially shortened',
                              False,
                              test_header=temp_header)
 
             # IID. lengthened token
             if isinstance(test_header['X-Auth-Token'], dict):
-                temp_header['X-Auth-Token']['function'] = lengthen
+                temp_header['X-Auth-Token']['function'] = lengthen_value
             else: 
                 temp_header['X-Auth-Token'] = original_token + 'a'
-            run_general_test('lengthened token',
+            yield general_case('lengthened token',
                              'success despite token being lengthened',
                              False,
                              test_header=temp_header)
@@ -844,11 +1842,11 @@ class APITester():
                     if i == j:
                         nothing['url'] = nothing['url'].replace('/'+placeholder, '<gone>', 1)
                         if isinstance(too_long['ids'][j], dict):
-                            too_long['ids'][j]['function'] = lengthen
+                            too_long['ids'][j]['function'] = lengthen_value
                         else: 
                             too_long['ids'][j] = too_long['ids'][j] + 'a'
                         if isinstance(too_short['ids'][j], dict):
-                            too_short['ids'][j]['function'] = shorten
+                            too_short['ids'][j]['function'] = shorten_value
                         else:
                             too_short['ids'][j] = too_short['ids'][j][:-1]
                     else:
@@ -858,42 +1856,34 @@ class APITester():
                 nothing['url'] = nothing['url'].replace('<still_here>', placeholder)
 
                 # IIIA. exclude id of focus
-                self.test['url'] = nothing['url']
-                run_general_test(f'exclude id piece #{i}',
+                yield general_case(f'exclude id piece #{i}',
                                  f'success when id piece #{i} excluded',
                                  False,
-                                 test_url_ids=nothing['ids'])
+                                 test_url_ids=nothing['ids'],
+                                 test_url=nothing['url'])
 
                 # IIIB. add something to id of focus
-                self.test['url'] = too_long['url']
-                run_general_test(f'added extra text to id piece #{i}',
+                yield general_case(f'added extra text to id piece #{i}',
                                  f'success when id piece #{i} was elongated',
                                  False,
-                                 test_url_ids=too_long['ids'])
+                                 test_url_ids=too_long['ids'],
+                                 test_url=too_long['url'])
 
                 # IIIC. take away piece of current id
-                self.test['url'] = too_short['url']
-                run_general_test(f'text removed from id piece #{i}',
+                yield general_case(f'text removed from id piece #{i}',
                                  f'success when id piece #{i} was shortened',
                                  False,
-                                 test_url_ids=too_short['ids'])
-            
-            self.test['url'] = original_additional_url
+                                 test_url_ids=too_short['ids'],
+                                 test_url=too_short['url'])
 
         ## Process results ------------------------------------------------------------------------
         
-        self.tests_summary_by_field.append({
-            'field': self._general_test_field,
-            'passed_tests': sum([1 for obj in self.results if obj['field'] == test_field and obj['expected_result']]),
-            'total_tests': sum([1 for obj in self.results if obj['field'] == test_field]),
-            'expected_tests': expected_tests
-        })
-
+        yield {'kind': 'summary', 'field': self._general_test_field, 'expected_tests': test_index}
         return
 
     def run_one_field(self, index, sample_size=5):
         '''
-        runs all standard field-specific tests for one specific field
+        runs all standard field-specific tests for one specific field (see field_plan)
 
         -- inputs --
         index (int): index of the field of focus in the test_fields array
@@ -902,6 +1892,23 @@ class APITester():
         
         -- outputs --
         None
+        '''
+        self.run_plan(self.field_plan(index, sample_size), self.test_fields[index]['test_field'])
+        return
+
+    def field_plan(self, index, sample_size=5):
+        '''
+        generates the test plan of all standard field-specific tests for one specific field without
+            running them
+
+        -- inputs --
+        index (int): index of the field of focus in the test_fields array
+        sample_size (int): number of random arrays to test an array datatype that has an array of
+            possible values
+        
+        -- outputs --
+        plan (generator): test cases in the order they should be run (see build_plan), ending with
+            a 'summary' case for the field
 
         -- test hierarchy
         I. General
@@ -986,109 +1993,81 @@ class APITester():
 
         test_input = copy.deepcopy(acceptable_input)
 
-        # Count expected tests ---------------------------------------------------------------------
-        
-        expected_tests = 5 # general tests
-        expected_tests += 1 if 'delete_field_test' in self.test and self.test['delete_field_test'] else 0
-        expected_tests += 3 if min_val else 0 # 3 min tests
-        expected_tests += 3 if max_val else 0 # 3 max tests
-        expected_tests += 2**5 + 1 if test_type=='email' else 0
-        for matching_field_set in self.matching_fields:
-            expected_tests += 1 if test_field in matching_field_set else 0
-        if test_type == 'password':
-            if min_length:
-                expected_tests += min_length+2
-            expected_tests += 3 if max_length else 0
-            expected_tests += 1 if upper_case else 0
-            expected_tests += 1 if lower_case else 0
-            expected_tests += 1 if number else 0
-            expected_tests += 1 if special_character else 0
-        if test_type !='array':
-            if array:
-                expected_tests += len(array) + 1
-            if test_type not in ['string', 'password', 'email', 'original_password']:
-                for key, value in dtype_test_values.items():
-                    if (key != test_type and # don't need to test current test_type
-                        not (key=='integer' and test_type=='float')): # integer is acceptable for floats
-                        expected_tests += 1
-        elif test_type == 'array':
-            expected_tests += 1
-            if array_type and array_type not in ['array', 'string']:
-                for key, value in dtype_test_values.items():
-                    if key != array_type:
-                        expected_tests += 1
-            expected_tests += 1 if duplicates else 0
-            if array: # array of possible values
-                expected_tests += len(array) + sample_size + 1
-                expected_tests += 1 + sample_size + 1
-        
-        self.l3_progress_bar['progress_bar'].steps = expected_tests
-        # Define method specific function to run test ---------------------------------------------
-
-        def run_field_test(test_name,
-                              error,
-                              test_expected_api_result,
-                              new_value='!!not input!!',
-                              match_fields=True,
-                              test_header=None,
-                              test_url_ids=None):
-            if new_value == '!!not input!!':
-                test_body = test_input
-            elif new_value == '!!delete!!':
-                test_body = self.update_fields(test_input, test_field, delete=True, match_fields=match_fields)
-            else:
-                test_body = self.update_fields(test_input, test_field, new_value=new_value, match_fields=match_fields)
-
-            expected_result = self.run_one_test(
+        test_index = 0
+        # Define method specific functions to create test cases -----------------------------------
+
+        def field_case(test_name,
+                       error,
+                       test_expected_api_result,
+                       new_value='!!not input!!',
+                       match_fields=True,
+                       test_header=None,
+                       test_url_ids=None):
+            nonlocal test_index
+            test_index += 1
+            # the body is only built when the case is run; new values are reused between cases
+            # (e.g., random arrays), so each case gets its own copy
+            body_update = None
+            if new_value != '!!not input!!':
+                body_update = {
+                    'body': test_input,
+                    'field': test_field,
+                    'new_value': None if new_value == '!!delete!!' else copy.deepcopy(new_value),
+                    'delete': new_value == '!!delete!!',
+                    'match_fields': match_fields
+                }
+            return case_template(
                 test_name=test_name,
                 error=error,
                 field=test_field,
                 test_expected_api_result=test_expected_api_result,
                 test_header=test_header,
-                test_body=test_body,
+                test_body=test_input if body_update is None else None,
                 test_url_ids=test_url_ids,
-                test_source='Field Tests'
-                                                
+                body_update=body_update,
+                test_source='Field Tests',
+                log_indices=(index, test_index-1)
             )
 
-            return
+        def field_result(result):
+            nonlocal test_index
+            test_index += 1
+            return {'kind': 'result', 'field': test_field, 'test_name': result['test_name'], 'result': result}
 
         # General field tests ---------------------------------------------------------------------
 
         # IA. (non-api test) check to make sure test field is input if required
         test_result = not (required and not check_field(test_input, test_field) and not default)
-        self.add_result(result_template(
+        yield field_result(result_template(
             test_result, False, 'test_field in input', 'test_field not in test_input', test_field, test_source='Field Tests'
             ))
-        self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
 
         # IB. (non-api test) check to make sure test_type is an acceptable value
         test_result =  test_type in ['string', 'integer', 'float', 'boolean', 'array', 'date', 'password', 'password_confirmation', 'email', 'original_password', 'dict']
-        self.add_result(result_template(
+        yield field_result(result_template(
             test_result, False, 'correct type', f'test_type {test_type} not an acceptable value', test_field, test_source='Field Tests'
             ))
-        self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
 
         # IC. test acceptable input
-        run_field_test(test_name='acceptable input',
+        yield field_case(test_name='acceptable input',
                        error='base case not accepted',
                        test_expected_api_result=True)
 
         # ID. test when null value for field
-        run_field_test(test_name='null field',
+        yield field_case(test_name='null field',
                        error=f'null values accepted for {test_field}',
                        test_expected_api_result=False,
                        new_value=None)
         
         # IE. test when no value for input field
-        run_field_test(test_name='no value',
+        yield field_case(test_name='no value',
                        error=f'null values accepted for {test_field}',
                        test_expected_api_result=(not required or default),
                        new_value='!!delete!!')
         
         # IF. test if value can be deleted
         if 'delete_field_test' in self.test and self.test['delete_field_test']:
-            run_field_test(test_name='delete value',
+            yield field_case(test_name='delete value',
                            error=f'{test_field} not successfully deleted' if deletable else f'{self.delete_value} accepted as input even thought it shouldn\'t have been accepted',
                            test_expected_api_result=deletable,
                            new_value=self.delete_value)
@@ -1098,7 +2077,7 @@ class APITester():
 
         if min_val:
             # IIA. below boundary
-            run_field_test('min: below boundary',
+            yield field_case('min: below boundary',
                            f'success when lower bound breached',
                            False,
                            new_value=test_boundary(min_val, -1, test_type)) # min_val - 1 if test_type != 'array' else [min_val - 1])
@@ -1107,13 +2086,13 @@ class APITester():
             temp_success = True
             if min_inc is not None:
                 temp_success = min_inc                
-            run_field_test('min: on boundary',
+            yield field_case('min: on boundary',
                            'failure when on min bound (expected success)' if temp_success else 'success when on min bound (expected failure)',
                            temp_success,
                            new_value=test_boundary(min_val, 0, test_type)) #min_val if test_type != 'array' else [min_val])
 
             # IIC. above boundary (within limits)
-            run_field_test('min: above boundary',
+            yield field_case('min: above boundary',
                            f'failure when lower bound upheld',
                            True,
                            new_value=test_boundary(min_val, 1, test_type)) #min_val + 1  if test_type != 'array' else [min_val + 1])
@@ -1122,7 +2101,7 @@ class APITester():
 
         if max_val: 
             # IIIA. above boundary
-            run_field_test('max: above boundary',
+            yield field_case('max: above boundary',
                            f'success when upper bound breached',
                            False,
                            new_value=test_boundary(max_val, 1, test_type)) #max_val + 1 if test_type != 'array' else [max_val + 1])
@@ -1131,13 +2110,13 @@ class APITester():
             temp_success = True
             if max_inc is not None:
                 temp_success = max_inc
-            run_field_test('min: on boundary',
+            yield field_case('min: on boundary',
                            'failure when on max bound (expected success)' if temp_success else 'success when on max bound (expected failure)',
                            temp_success,
                            new_value=test_boundary(max_val, 0, test_type))#max_val if test_type != 'array' else [max_val])
 
             # IIIC. below boundary (within limits)
-            run_field_test('max: below boundary',
+            yield field_case('max: below boundary',
                            f'failure when upper bound upheld',
                            True,
                            new_value=test_boundary(max_val, -1, test_type))#max_val - 1 if test_type != 'array' else [max_val - 1])
@@ -1151,14 +2130,14 @@ class APITester():
             for scenario in scenarios:
                 temp_email = ''.join([email_pieces[i] if val else '' for i, val in enumerate(scenario)])            
                 email_success = all(scenario)
-                run_field_test('valid email',
+                yield field_case('valid email',
                                'failed email when expecting success' if email_success else f'success email when expected failure ({temp_email})',
                                email_success,
                                new_value=temp_email)
 
             # IVB. existing email
             if existing_email:
-                run_field_test('email already in database',
+                yield field_case('email already in database',
                                f'success despite using a duplicate email address ({existing_email})',
                                False,
                                new_value=existing_email)
@@ -1222,7 +2201,7 @@ class APITester():
                         current_val = [current_val]
                         updated_val = [updated_val]
                 
-                run_field_test('Different matching values',
+                yield field_case('Different matching values',
                                f'Success despite different matching values for {test_field} ({matching_field_set})',
                                False,
                                new_value=updated_val,
@@ -1238,7 +2217,7 @@ class APITester():
                 for i in range(min_length+2):
                     temp_password = acceptable_password[:i]
                     min_length_success = (i >= min_length)
-                    run_field_test('password min length',
+                    yield field_case('password min length',
                                    f'failed min password when expecting success (length = {i})' if min_length_success else f'success min password when expected failure (length = {i})',
                                    min_length_success,
                                    new_value=temp_password)
@@ -1251,21 +2230,21 @@ class APITester():
                         while len(temp_password) < i:
                             temp_password += temp_password[:i - len(temp_password)]
                     max_length_success = (i <= max_length)
-                    run_field_test('password length',
+                    yield field_case('password length',
                                    f'failed max password when expecting success (length = {i})' if max_length_success else f'success max password when expected failure (length = {i})',
                                    max_length_success,
                                    new_value=temp_password)
             
             if upper_case:
                 # VIC. uppercase required
-                run_field_test('password upper case required',
+                yield field_case('password upper case required',
                                'Success when expected failure',
                                False,
                                new_value=acceptable_password.lower())
             
             if lower_case:
                 # VID. lowercase required
-                run_field_test('password lower case required',
+                yield field_case('password lower case required',
                                'Success when expected failure',
                                False,
                                new_value=acceptable_password.upper())
@@ -1279,7 +2258,7 @@ class APITester():
                         temp_password += temp_password[:min_length - len(temp_password)]
                 if max_length is not None and len(temp_password) > max_length:
                     temp_password = temp_password[:max_length]
-                run_field_test('password number required',
+                yield field_case('password number required',
                                'Success when expected failure',
                                False,
                                new_value=temp_password)
@@ -1292,7 +2271,7 @@ class APITester():
                         temp_password += temp_password[:min_length - len(temp_password)]
                 if max_length is not None and len(temp_password) > max_length:
                     temp_password = temp_password[:max_length]
-                run_field_test('password special character required',
+                yield field_case('password special character required',
                                'Success when expected failure',
                                False,
                                new_value=temp_password)
@@ -1307,13 +2286,13 @@ class APITester():
 
                 for val in array:
                     # VIIA1. test all values
-                    run_field_test('single values w/array of options (test all values)',
+                    yield field_case('single values w/array of options (test all values)',
                                    f'failed for input value: {val}',
                                    True,
                                    new_value=val)
                     dummy = val
                 # VIIA2. test  value outside of possible array (match datatype)
-                run_field_test('single values with/array of options, value outside of array',
+                yield field_case('single values with/array of options, value outside of array',
                                'Success when using value outside of value in possible array',
                                False,
                                new_value=excluded)
@@ -1323,7 +2302,7 @@ class APITester():
                     if (key != test_type and # don't need to test current test_type
                         not (key=='integer' and test_type=='float')): # integer is acceptable for floats
                         # VIIB. wrong data type
-                        run_field_test('Wrong data type',
+                        yield field_case('Wrong data type',
                                        f'type success when expected failure ({key} worked for {test_type})',
                                        False,
                                        new_value=value)
@@ -1333,7 +2312,7 @@ class APITester():
         elif test_type == 'array':
 
             # VIIIA. empty array
-            run_field_test('empty array',
+            yield field_case('empty array',
                            'empty array accepted as input',
                            False,
                            new_value=[])
@@ -1342,7 +2321,7 @@ class APITester():
                 # VIIIB. array with wrong data type
                 for key, value in dtype_test_values.items():
                     if key != array_type:
-                        run_field_test('array wrong data type',
+                        yield field_case('array wrong data type',
                                        f'type success when expected failure ({key} worked for {test_type})',
                                        False,
                                        new_value=[value])
@@ -1350,7 +2329,7 @@ class APITester():
             if duplicates is not None:
                 # VIIIC1. duplicate array values
                 acceptable_value = get_field_value(acceptable_input, test_field)[0]
-                run_field_test('duplicate array values',
+                yield field_case('duplicate array values',
                                f'type success when duplicate values present',
                                duplicates,
                                new_value=[acceptable_value, acceptable_value])
@@ -1362,13 +2341,13 @@ class APITester():
                 
                 # VIIID1. test each possible value in array
                 for val in array:
-                    run_field_test('array: all individual values',
+                    yield field_case('array: all individual values',
                                    f'failed for single value: {val}',
                                    True,
                                    new_value=[val])
                 
                 # VIIID2. single value outside of possible array (match datatype)
-                run_field_test('array: single value outside of possible array',
+                yield field_case('array: single value outside of possible array',
                                f'succssfully ran despite using value not in possible array: {excluded}',
                                False,
                                new_value=[excluded])
@@ -1379,7 +2358,7 @@ class APITester():
                     random_indices = random.sample(range(len(array)), num_indices) # Select random non-repeated indices from the array
                     random_indices.sort() # sort in numerical order
                     random_array = [array[index] for index in random_indices] # Create the random array based on the selected indices
-                    run_field_test('array: random mix of values',
+                    yield field_case('array: random mix of values',
                                    f'failed for random sampling of {test_field}: {array[random_array]}',
                                    True,
                                    new_value=random_array)
@@ -1387,38 +2366,32 @@ class APITester():
                     # VIIID4. single value outside of possible array (match datatype) included
                     #   with handful of random values from possible array
                     random_array[0] = excluded
-                    run_field_test('array: random mix of values with single value outside of possible array',
+                    yield field_case('array: random mix of values with single value outside of possible array',
                                    f'succeeded for random sampling of {test_field}: {array[random_array]} with single value outside of possible array',
                                    False,
                                    new_value=random_array)
                 
                 # VIIID5. all values in possible array
-                run_field_test('array: all values',
+                yield field_case('array: all values',
                                f'failed for an array of all possible values for {test_field}',
                                True,
                                new_value=array)
                 
                 # VIIID6. single value outside of possible array (match datatype) included
                 #   with all values from possible array
-                run_field_test('array: all values with single value outside of possible array',
+                yield field_case('array: all values with single value outside of possible array',
                                f'succeeded for all values plus single value outside of possible array: {excluded}',
                                False,
                                new_value=array + [excluded])
 
         ## Process results ------------------------------------------------------------------------
 
-        self.tests_summary_by_field.append({
-            'field': test_field,
-            'passed_tests': sum([1 for obj in self.results if obj['field'] == test_field and obj['expected_result']]),
-            'total_tests': sum([1 for obj in self.results if obj['field'] == test_field]),
-            'expected_tests': expected_tests
-        })
-
+        yield {'kind': 'summary', 'field': test_field, 'expected_tests': test_index}
         return
 
     def run_custom_inputs(self):
         '''
-        runs all tests specified by the custom_inputs attribute
+        runs all tests specified by the custom_inputs attribute (see custom_inputs_plan)
 
         -- inputs --
         None
@@ -1426,6 +2399,20 @@ class APITester():
         -- outputs --
         None
         '''
+        self.run_plan(self.custom_inputs_plan(), 'custom_inputs')
+        return
+
+    def custom_inputs_plan(self):
+        '''
+        generates the test plan of all tests specified by the custom_inputs attribute without
+            running them
+
+        -- inputs --
+        None
+
+        -- outputs --
+        plan (generator): test cases in the order they should be run (see build_plan)
+        '''
 
         def extract_input_base(obj, attr, alt_value):
             return alt_value if attr not in obj else obj[attr]
@@ -1443,7 +2430,7 @@ class APITester():
             test_body = extract_input('test_body', None)
             test_url_ids = extract_input('test_url_ids', None)
             
-            expected_result = self.run_one_test(
+            yield case_template(
                 test_name=test_name,
                 error=error,
                 field=field,
@@ -1451,19 +2438,190 @@ class APITester():
                 test_header=test_header,
                 test_body=test_body,
                 test_url_ids=test_url_ids,
-                test_source='Custom Inputs Test'
+                test_source='Custom Inputs Test',
+                log_indices=(0, i)
             )
             
-            
+        return
+
+    def build_plan(self, sample_size=5, placeholder='<id>'):
+        '''
+        generates the test plan of all general tests, field tests, and custom inputs tests (in the
+            order run_all_tests runs them) without running them or building any requests
+
+        -- inputs --
+        sample_size (int): number of random arrays to test an array datatype that has an array of
+            possible values
+        placeholder (string): the string in urls that will be replaced by ids
+
+        -- outputs --
+        plan (generator): test cases, each a dict with a 'kind' of one of the following:
+            'api': a test that needs an api request, in the form of the case_template function
+            'result': a test that does not need an api request with the following form:
+                field (string): field being tested
+                test_name (string): name of the test
+                result (dict): result of the test in the form of the result_template function
+            'summary': marks the end of the tests of a field (or the general tests) with the
+                following form:
+                field (string): field whose tests have ended
+                expected_tests (int): number of test cases of the field
+
+        Notes: the plan can be filtered or counted before running it with run_plan (e.g., to do a
+        dry run or rerun the tests of one field); random samples of array tests are drawn when the
+        plan is generated, so generating it again gives different samples
+        '''
+        yield from self.general_plan(placeholder)
+        for i, field in enumerate(self.test_fields):
+            yield from self.field_plan(i, sample_size)
+        yield from self.custom_inputs_plan()
+        return
+
+    def run_plan(self, plan, name='plan'):
+        '''
+        runs the test cases of a test plan one at a time, adding results and tests_summary_by_field
+            entries as they are reached
+
+        -- inputs --
+        plan (iterable): test cases in the form described in build_plan
+        name (string): name of the plan passed to hooks (e.g., the field of a field_plan)
+
+        -- outputs --
+        None
+        '''
+        cases = self.collect_plan(plan, name)
+        self.l3_progress_bar['progress_bar'].steps = sum([1 for case in cases if case['kind'] != 'summary'])
+        if self._fixture_pool is not None and not self.predo['on_success']:
+            # every test runs the predo; with on_success, fixtures are only made as tests take them
+            self._fixture_pool.allow(sum([1 for case in cases if case['kind'] == 'api']))
+
+        for case in cases:
+            if case['kind'] == 'summary':
+                self.add_summary(case)
+            elif case['kind'] == 'result':
+                self.add_result(case['result'])
+                self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
+            else:
+                self.run_one_test(
+                    test_name=case['test_name'],
+                    error=case['error'],
+                    field=case['field'],
+                    test_expected_api_result=case['test_expected_api_result'],
+                    test_header=case['test_header'],
+                    test_body=self.build_test_body(case),
+                    test_url_ids=case['test_url_ids'],
+                    test_source=case['test_source'],
+                    test_url=case['test_url']
+                )
+        return
+
+    def collect_plan(self, plan, name='plan'):
+        '''
+        generates every test case of a test plan, running the before_plan and after_plan hooks
+
+        -- inputs --
+        plan (iterable): test cases in the form described in build_plan
+        name (string): name of the plan passed to hooks
+
+        -- outputs --
+        cases (list): test cases of the plan
+        '''
+        start = time.perf_counter()
+        if self.hooks['before_plan']:
+            self.run_hooks('before_plan', {'plan': name, 'start': start})
+        cases = list(plan)
+        if self.hooks['after_plan']:
+            self.run_hooks('after_plan', {'plan': name, 'start': start, 'elapsed': time.perf_counter() - start, 'cases': cases})
+        return cases
+
+    def add_hook(self, event, function):
+        '''
+        registers a function to be run at one point of every run (see hooks input attribute)
+
+        -- inputs --
+        event (string): 'before_plan', 'after_plan', 'before_api', 'after_api', or 'after_result'
+        function (function): function with a single input (dict of information about the event)
+
+        -- outputs --
+        None
+        '''
+        if event not in self._hook_events:
+            raise ValueError(f"event must be one of {self._hook_events} ('{event}' provided)")
+        self.hooks[event].append(function)
+        return
+
+    def run_hooks(self, event, info):
+        '''
+        runs every function registered for an event
+
+        -- inputs --
+        event (string): event being run (see add_hook)
+        info (dict): information about the event; 'event' and 'thread' (id of the thread running
+            the event) are added before it is passed to each function
+
+        -- outputs --
+        None
+        '''
+        if len(self.hooks[event]) == 0:
+            return
+        info = dict(info, event=event, thread=threading.get_ident())
+        for function in self.hooks[event]:
+            function(info)
+        return
+
+    def build_test_body(self, case):
+        '''
+        builds the test body of a test case
+
+        -- inputs --
+        case (dict): test case in the form of the case_template function
+
+        -- outputs --
+        test_body (dict): body to be sent in the test api request (None to keep test['body'])
+        '''
+        body_update = case['body_update']
+        if body_update is None:
+            return case['test_body']
+        return self.update_fields(
+            body_update['body'],
+            body_update['field'],
+            new_value=body_update['new_value'],
+            delete=body_update['delete'],
+            match_fields=body_update['match_fields']
+        )
+
+    def add_summary(self, case):
+        '''
+        adds a tests_summary_by_field entry for the field of a 'summary' test case, using the counts
+            of the results of that field added so far
+
+        -- inputs --
+        case (dict): 'summary' test case (see build_plan)
+
+        -- outputs --
+        None
+        '''
+        self._add_field_summary({
+            'field': case['field'],
+            **self.result_counts.get(case['field'], self._counts_init),
+            'expected_tests': case['expected_tests']
+        })
+        return
+
+    def _add_field_summary(self, summary):
+        self.tests_summary_by_field.append(summary)
+        for key in ['passed_tests', 'total_tests', 'throttled', 'expected_tests']:
+            self.tests_summary[key] = self.tests_summary.get(key, 0) + summary[key]
         return
     
-    def run_all_tests(self, print_status_override=None, print_json_override=None):
+    def run_all_tests(self, print_status_override=None, print_json_override=None, workers=1):
         '''
         runs general tests, all field tests, custom tests then sythesizes results
 
         -- inputs --
         print_status_override (bool): overrides the self.print_status value, resetting it at the end
         print_json_override (bool): overrides the self.print_json value, resetting it at the end
+        workers (int): number of fields to test at one time (see run_fields_parallel); fields are
+            tested one at a time if 1
 
         -- outputs --
         None
@@ -1476,89 +2634,748 @@ class APITester():
             original_pj = self.print_json
             self.print_json = print_json_override
 
-        # setup progress bar ----------------------------------------------------------------------
-        fields_contribution = 1 if len(self.test_fields) > 0 else 0
-        custom_inputs_contribution = 1 if len(self.custom_inputs) > 0 else 0
-        custom_contribution = 1 if len(self.custom_tests) > 0 else 0
-        self.l1_progress_bar['progress_bar'].steps = 1 + fields_contribution + custom_inputs_contribution + custom_contribution
-        self.l1_progress_bar['current_step'] = -1
-
-        # run general tests -----------------------------------------------------------------------
-        self.l1_progress_bar['suffix'] = ' {} / {} running general tests'
-        self.l3_progress_bar['active'] = True
-        self.run_general_tests()
-        if self.test['final_undo'] and not self.log['test']['api_result']:
-            self.run_one_api('test', self._general_test_field)
-        self.l3_progress_bar['active'] = False
-        self.l1_progress_bar['current_step'] += 1
-
-        # run field tests ------------------------------------------------------------------------
-        if len(self.test_fields) > 0:
-            self.l1_progress_bar['suffix'] = ' {} / {} running field tests'
-            self.l2_progress_bar['active'] = True
-            self.l2_progress_bar['suffix'] = ' {} / {} fields tested'
-            self.l2_progress_bar['progress_bar'].steps = len(self.test_fields)
-            self.update_progress_bars()
+        # compile requests and start deadline -----------------------------------------------------
+        self.compile_requests()
+        self.start_deadline()
+
+        # start progress renderer and fixture pool ------------------------------------------------
+        self.start_progress()
+        try:
+            self.start_fixture_pool()
+
+            # setup progress bar ------------------------------------------------------------------
+            fields_contribution = 1 if len(self.test_fields) > 0 else 0
+            custom_inputs_contribution = 1 if len(self.custom_inputs) > 0 else 0
+            custom_contribution = 1 if len(self.custom_tests) > 0 else 0
+            self.l1_progress_bar['progress_bar'].steps = 1 + fields_contribution + custom_inputs_contribution + custom_contribution
+            self.l1_progress_bar['current_step'] = -1
+
+            # run general tests -------------------------------------------------------------------
+            self.l1_progress_bar['suffix'] = ' {} / {} running general tests'
             self.l3_progress_bar['active'] = True
-            for i, field in enumerate(self.test_fields):
+            self.run_general_tests()
+            if self._final_undo_needed(self.log):
+                self.run_one_api('test', self._general_test_field, decode=False)
+            self.l3_progress_bar['active'] = False
+            self.l1_progress_bar['current_step'] += 1
+
+            # run field tests ---------------------------------------------------------------------
+            if len(self.test_fields) > 0:
+                self.l1_progress_bar['suffix'] = ' {} / {} running field tests'
+                self.l2_progress_bar['active'] = True
+                self.l2_progress_bar['suffix'] = ' {} / {} fields tested'
+                self.l2_progress_bar['progress_bar'].steps = len(self.test_fields)
+                self.update_progress_bars()
+                self.l3_progress_bar['active'] = True
+                if workers > 1:
+                    self.run_fields_parallel(workers)
+                else:
+                    for i, field in enumerate(self.test_fields):
+                        self.l3_progress_bar['issues'] = 0
+                        self.run_one_field(i)
+                        self.update_progress_bars({'l2': i, 'l3': -1})
+                    if self._final_undo_needed(self.log):
+                        self.run_one_api('test', self._general_test_field, decode=False)
+                self.update_progress_bars({'l2': -1, 'l3': 0-1}, print_progress_override=False)
                 self.l3_progress_bar['issues'] = 0
-                self.run_one_field(i)
-                self.update_progress_bars({'l2': i, 'l3': -1})
-            if self.test['final_undo'] and not self.log['test']['api_result']:
-                self.run_one_api('test', self._general_test_field)
-            self.update_progress_bars({'l2': -1, 'l3': 0-1}, print_progress_override=False)
+                self.l3_progress_bar['active'] = False
+                self.l2_progress_bar['issues'] = 0
+                self.l2_progress_bar['active'] = False
+                self.l1_progress_bar['current_step'] += fields_contribution
+
+            # run custom input test ---------------------------------------------------------------
+            ## TO DO add code to ensure that progress bar works properly around this (might have to jump into run_custom_inputs function
+            ##     TO DO also consider adding 'source' to output to say whether the test came from general, field, custom inputs or custom function,
+            if len(self.custom_inputs) > 0:
+                self.l1_progress_bar['suffix'] = ' {} / {} running custom inputs tests'
+                self.l3_progress_bar['active'] = True
+                self.l3_progress_bar['progress_bar'].steps = len(self.custom_inputs)
+                self.l3_progress_bar['issues'] = 0
+                self.update_progress_bars({'l3': -1})
+                self.run_custom_inputs()
+                if self._final_undo_needed(self.log):
+                    self.run_one_api('test', self._general_test_field, decode=False)
+                self.l3_progress_bar['issues'] = 0
+                self.l3_progress_bar['active'] = False
+                self.l1_progress_bar['current_step'] += custom_inputs_contribution
+
+            # run custom tests --------------------------------------------------------------------
+            self.run_custom_tests()
+
+            # process results ---------------------------------------------------------------------
+            self.l1_progress_bar['current_step'] += custom_contribution
+            self.update_progress_bars()
+
+            self.summarize_results()
+        except BaseException:
+            # results added before the failure are written out and the files released
+            self.close_sinks()
+            raise
+        else:
+            self.flush_sinks()
+        finally:
+            self.stop_fixture_pool()
+            self.stop_progress()
+
+            # reset print statuses ----------------------------------------------------------------
+            if print_status_override:
+                self.print_status = original_ps
+            if print_json_override:
+                self.print_json = original_pj
+        return
+
+    async def run_all_tests_async(self, max_concurrency=10, print_status_override=None, print_json_override=None):
+        '''
+        runs general tests, all field tests, custom inputs tests, and custom tests, running the
+            predo/test/undo chain of each general/field/custom input test concurrently, then
+            sythesizes results; should be awaited (e.g., `await tester.run_all_tests_async()` in a
+            notebook or `asyncio.run(tester.run_all_tests_async())` in a script)
+
+        -- inputs --
+        max_concurrency (int): max number of chains that can be in flight at one time
+        print_status_override (bool): overrides the self.print_status value, resetting it at the end
+        print_json_override (bool): overrides the self.print_json value, resetting it at the end
+
+        -- outputs --
+        None
+
+        Notes: every chain is run against its own log so chains do not see each other's requests;
+        the predo is therefore run for every chain, regardless of predo['on_success'], and when
+        test['final_undo'] is True the test is rerun with its standard inputs at the end of any
+        chain whose test request was not successful. The API being tested must be able to handle
+        max_concurrency requests at once and tests should not depend on one another's side
+        effects. Results are added to self.results in the same order as run_all_tests; custom
+        tests are run afterwards, one at a time.
+        '''
+        if max_concurrency < 1:
+            raise ValueError(f'max_concurrency must be at least 1 ({max_concurrency} provided)')
+
+        # process print statuses ------------------------------------------------------------------
+        if print_status_override:
+            original_ps = self.print_status
+            self.print_status = print_status_override
+        if print_json_override:
+            original_pj = self.print_json
+            self.print_json = print_json_override
+
+        # compile requests and start deadline -----------------------------------------------------
+        self.compile_requests()
+        self.start_deadline()
+
+        # start progress renderer and fixture pool ------------------------------------------------
+        self.start_progress()
+        try:
+            self.start_fixture_pool()
+
+            # build test plan ---------------------------------------------------------------------
+            cases = self.collect_plan(self.build_plan(), 'all')
+            chains = [i for i, case in enumerate(cases) if case['kind'] == 'api']
+            if self._fixture_pool is not None:
+                self._fixture_pool.allow(len(chains))
+
+            # setup progress bar ------------------------------------------------------------------
+            custom_contribution = 1 if len(self.custom_tests) > 0 else 0
+            self.l1_progress_bar['progress_bar'].steps = 1 + custom_contribution
+            self.l1_progress_bar['current_step'] = -1
+            self.l1_progress_bar['suffix'] = ' {} / {} running test chains'
+            self.l3_progress_bar['active'] = True
+            self.l3_progress_bar['progress_bar'].steps = len(chains)
+            self.l3_progress_bar['issues'] = 0
+            self.update_progress_bars({'l3': -1})
+
+            # run chains --------------------------------------------------------------------------
+            outputs = [case['result'] if case['kind'] == 'result' else None for case in cases]
+            semaphore = asyncio.Semaphore(max_concurrency)
+            loop = asyncio.get_running_loop()
+
+            added = 0
+
+            async def run_chain(executor, index):
+                nonlocal added
+                async with semaphore:
+                    outputs[index] = await loop.run_in_executor(executor, self._run_independent_chain, cases[index])
+                added = self._add_case_results(cases, outputs, added)
+                self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+1})
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                await asyncio.gather(*[run_chain(executor, i) for i in chains])
+
+            self._add_case_results(cases, outputs, added)
             self.l3_progress_bar['issues'] = 0
             self.l3_progress_bar['active'] = False
-            self.l2_progress_bar['issues'] = 0
-            self.l2_progress_bar['active'] = False
-            self.l1_progress_bar['current_step'] += fields_contribution
-
-        # run custom input test -------------------------------------------------------------------
-        ## TO DO add code to ensure that progress bar works properly around this (might have to jump into run_custom_inputs function
-        ##     TO DO also consider adding 'source' to output to say whether the test came from general, field, custom inputs or custom function,
-        if len(self.custom_inputs) > 0:
-            self.l1_progress_bar['suffix'] = ' {} / {} running custom inputs tests'
+            self.l1_progress_bar['current_step'] += 1
+
+            # run custom tests --------------------------------------------------------------------
+            self.run_custom_tests()
+
+            # process results ---------------------------------------------------------------------
+            self.l1_progress_bar['current_step'] += custom_contribution
+            self.update_progress_bars()
+
+            self.summarize_results()
+        except BaseException:
+            # results added before the failure are written out and the files released
+            self.close_sinks()
+            raise
+        else:
+            self.flush_sinks()
+        finally:
+            self.stop_fixture_pool()
+            self.stop_progress()
+
+            # reset print statuses ----------------------------------------------------------------
+            if print_status_override:
+                self.print_status = original_ps
+            if print_json_override:
+                self.print_json = original_pj
+        return
+
+    def run_all_tests_sharded(self, processes=None, print_status_override=None, print_json_override=None):
+        '''
+        runs general tests, all field tests, custom inputs tests, and custom tests, splitting the
+            predo/test/undo chains of the general/field/custom input tests across processes, then
+            sythesizes results
+
+        -- inputs --
+        processes (int): number of processes to split the chains across; default is the number of
+            cpus
+        print_status_override (bool): overrides the self.print_status value, resetting it at the end
+        print_json_override (bool): overrides the self.print_json value, resetting it at the end
+
+        -- outputs --
+        None
+
+        Notes: each process builds its own tester from tester_definition, so the predo/test/undo
+        definitions, test cases, and transport (if not the default) must be picklable; requests
+        functions are sent as their http method names, but any other function (e.g., a referenced
+        value 'function') must be defined at the top level of a module. Chains are run in the same
+        way as run_all_tests_async (independent logs) one at a time within each process. Scripts
+        using this on platforms that start processes by spawning (Windows, macOS) must call it
+        under `if __name__ == '__main__':`. Custom tests are run in this process afterwards.
+        '''
+        processes = processes if processes is not None else (os.cpu_count() or 1)
+        if processes < 1:
+            raise ValueError(f'processes must be at least 1 ({processes} provided)')
+
+        # process print statuses ------------------------------------------------------------------
+        if print_status_override:
+            original_ps = self.print_status
+            self.print_status = print_status_override
+        if print_json_override:
+            original_pj = self.print_json
+            self.print_json = print_json_override
+
+        # compile requests and start deadline -----------------------------------------------------
+        self.compile_requests()
+        self.start_deadline()
+
+        # start progress renderer -----------------------------------------------------------------
+        self.start_progress()
+        try:
+
+            # build test plan and split it into shards --------------------------------------------
+            cases = self.collect_plan(self.build_plan(), 'all')
+            chains = [i for i, case in enumerate(cases) if case['kind'] == 'api']
+            shards = [chains[i::processes] for i in range(processes) if len(chains[i::processes]) > 0]
+            definition = self.tester_definition()
+            if self.rate_limiter is not None and len(shards) > 0:
+                # each process gets an equal share of the rate limit
+                definition['rate_limit'] = TokenBucket(self.rate_limiter.rate / len(shards), max(1, self.rate_limiter.burst // len(shards)))
+            if self.concurrency_controller is not None and len(shards) > 0:
+                # and an equal share of the concurrency limits (at least 1 request each)
+                controller = self.concurrency_controller
+                share = lambda limit: max(1, int(limit) // len(shards))
+                definition['concurrency_controller'] = AIMDController(
+                    share(controller.limit), share(controller.min_limit), share(controller.max_limit),
+                    controller.increase, controller.decrease, controller.latency_factor)
+
+            # setup progress bar ------------------------------------------------------------------
+            custom_contribution = 1 if len(self.custom_tests) > 0 else 0
+            self.l1_progress_bar['progress_bar'].steps = 1 + custom_contribution
+            self.l1_progress_bar['current_step'] = -1
+            self.l1_progress_bar['suffix'] = ' {} / {} running test chains'
             self.l3_progress_bar['active'] = True
-            self.l3_progress_bar['progress_bar'].steps = len(self.custom_inputs)
+            self.l3_progress_bar['progress_bar'].steps = len(chains)
             self.l3_progress_bar['issues'] = 0
             self.update_progress_bars({'l3': -1})
-            self.run_custom_inputs()
-            if self.test['final_undo'] and not self.log['test']['api_result']:
-                self.run_one_api('test', self._general_test_field)
+
+            # run shards --------------------------------------------------------------------------
+            outputs = [case['result'] if case['kind'] == 'result' else None for case in cases]
+            added = 0
+            self.unused_fixtures = []
+            if len(shards) > 0:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                    futures = [executor.submit(_run_shard, definition, [cases[i] for i in shard], self._deadline_at) for shard in shards]
+                    for future in concurrent.futures.as_completed(futures):
+                        shard = shards[futures.index(future)]
+                        shard_results, shard_issues, shard_deadline_reached, shard_unused_fixtures = future.result()
+                        self.deadline_reached = self.deadline_reached or shard_deadline_reached
+                        self.unused_fixtures.extend(shard_unused_fixtures)
+                        for i, result in zip(shard, shard_results):
+                            outputs[i] = result
+                        added = self._add_case_results(cases, outputs, added)
+                        self.l1_progress_bar['issues'] += shard_issues
+                        self.l3_progress_bar['issues'] += shard_issues
+                        self.update_progress_bars({'l3': self.l3_progress_bar['current_step']+len(shard)})
+
+            self._add_case_results(cases, outputs, added)
             self.l3_progress_bar['issues'] = 0
             self.l3_progress_bar['active'] = False
-            self.l1_progress_bar['current_step'] += custom_inputs_contribution
+            self.l1_progress_bar['current_step'] += 1
+
+            # run custom tests --------------------------------------------------------------------
+            self.run_custom_tests()
+
+            # process results ---------------------------------------------------------------------
+            self.l1_progress_bar['current_step'] += custom_contribution
+            self.update_progress_bars()
+
+            self.summarize_results()
+        except BaseException:
+            # results added before the failure are written out and the files released
+            self.close_sinks()
+            raise
+        else:
+            self.flush_sinks()
+        finally:
+            self.stop_progress()
+
+            # reset print statuses ----------------------------------------------------------------
+            if print_status_override:
+                self.print_status = original_ps
+            if print_json_override:
+                self.print_json = original_pj
+        return
+
+    def load_cases(self, mix=None):
+        '''
+        finds the test cases run_load runs and their weights: the acceptable base case of the
+            general tests and, if in mix, custom_inputs tests
 
-        # run custom tests ------------------------------------------------------------------------
+        -- inputs --
+        mix (dict): weight of each test case by test name (e.g., {'acceptable base case': 8,
+            'custom_inputs test #0': 2}); the acceptable base case alone if None
+
+        -- outputs --
+        cases (list): test cases in the form of the case_template function
+        weights (list): weight of each case
+        '''
+        base_case = next(case for case in self.general_plan() if case['kind'] == 'api')
+        if mix is None:
+            return [base_case], [1]
+
+        available = {base_case['test_name']: base_case}
+        for case in self.custom_inputs_plan():
+            available[case['test_name']] = case
+        for test_name in mix:
+            if test_name not in available:
+                raise ValueError(f"'{test_name}' in mix is not the acceptable base case or a custom_inputs test (should be one of {list(available)})")
+        cases = [available[test_name] for test_name in mix]
+        weights = [mix[test_name] for test_name in mix]
+        return cases, weights
+
+    def run_load(self, duration, target_rps=None, concurrency=None, mix=None, window=1.0, percentiles=(50, 95, 99)):
+        '''
+        runs the predo/test/undo chain of the acceptable base case (and, with mix, a weighted mix of
+            custom_inputs tests) over and over for a length of time and reports throughput, error
+            rate, and test request latency over time windows, so that the same tester can be used
+            as a load or capacity test; results are not added to self.results
+
+        -- inputs --
+        duration (float): seconds to start chains for; chains in flight at the end are finished
+        target_rps (float): chains started per second (open loop: chains are started on schedule
+            whether or not earlier chains have finished; a chain is skipped if concurrency chains
+            are already in flight)
+        concurrency (int): number of chains run at one time; without target_rps, each of these
+            runs chains back to back (closed loop); with target_rps, max chains in flight
+            (default 100)
+        mix (dict): weight of each test case by test name (see load_cases)
+        window (float): seconds in each window of the report
+        percentiles (tuple): percentiles (0-100) of test request latency to report
+
+        -- outputs --
+        report (dict): report of the run (also kept in load_report) with the following structure:
+            duration (float): seconds from the start of the run to the end of the last chain
+            chains (int): number of chains run
+            throughput (float): chains finished per second
+            errors (int): number of chains whose test did not give the expected result (including
+                transport errors and throttled responses)
+            error_rate (float): errors / chains
+            not_started (int): chains scheduled by target_rps that were not started because
+                concurrency chains were already in flight (the API could not keep up)
+            status_codes (dict): number of test responses with each status code (None for
+                transport errors and chains whose test was not run)
+            latency (dict): percentiles (e.g., 'p50') and max of test request time in seconds
+            by_test (dict): chains, errors, and latency percentiles for each test name
+            windows (list): for each window (by the time chains finished): start and end (seconds
+                from the start of the run), chains, throughput, errors, error_rate, and latency
+                percentiles
+
+        Notes: every chain is run against its own log (see run_all_tests_async), so the predo is
+        run for every chain (unless it is cached or pooled) and the API must be able to handle
+        concurrency requests at once; rate_limit and concurrency_controller also apply
+        '''
+        if target_rps is None and concurrency is None:
+            raise ValueError('run_load needs target_rps, concurrency, or both')
+        if target_rps is not None and target_rps <= 0:
+            raise ValueError(f'target_rps must be greater than 0 ({target_rps} provided)')
+        if concurrency is not None and concurrency < 1:
+            raise ValueError(f'concurrency must be at least 1 ({concurrency} provided)')
+        if window <= 0:
+            raise ValueError(f'window must be greater than 0 ({window} provided)')
+
+        self.compile_requests()
+        self.start_deadline()
+        self.start_fixture_pool()
+        cases, weights = self.load_cases(mix)
+
+        records = []
+        records_lock = threading.Lock()
+        run_start = time.perf_counter()
+        run_end = run_start + duration
+
+        def run_chain(case):
+            if self._fixture_pool is not None:
+                self._fixture_pool.allow(1)
+            result = self._run_independent_chain(case)
+            with records_lock:
+                records.append((time.perf_counter() - run_start, case['test_name'], not result['expected_result'],
+                                result['test_status_code'], result['test_time']))
+            return
+
+        not_started = 0
+        try:
+            if target_rps is None:
+                # closed loop: each worker runs chains back to back
+                def run_worker():
+                    while time.perf_counter() < run_end:
+                        run_chain(random.choices(cases, weights)[0])
+                    return
+
+                with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    for future in [executor.submit(run_worker) for i in range(concurrency)]:
+                        future.result()
+            else:
+                # open loop: chains are started on schedule, up to concurrency at one time
+                slots = threading.BoundedSemaphore(concurrency if concurrency is not None else 100)
+
+                def run_scheduled(case):
+                    try:
+                        run_chain(case)
+                    finally:
+                        slots.release()
+                    return
+
+                with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency if concurrency is not None else 100) as executor:
+                    futures = []
+                    for i in itertools.count():
+                        start_at = run_start + i / target_rps
+                        if start_at >= run_end:
+                            break
+                        time.sleep(max(0, start_at - time.perf_counter()))
+                        if not slots.acquire(blocking=False):
+                            not_started += 1
+                            continue
+                        futures.append(executor.submit(run_scheduled, random.choices(cases, weights)[0]))
+                    for future in futures:
+                        future.result()
+        finally:
+            self.stop_fixture_pool()
+
+        self.load_report = self.load_summary(records, time.perf_counter() - run_start, window, percentiles)
+        self.load_report['not_started'] = not_started
+        return self.load_report
+
+    def load_summary(self, records, duration, window=1.0, percentiles=(50, 95, 99)):
+        '''
+        summarizes the chains run by run_load (see run_load for the report structure)
+
+        -- inputs --
+        records (list): (seconds from the start of the run when the chain finished, test name,
+            whether it was an error, test status code, test request time) of each chain
+        duration (float): seconds the run took
+        window (float): seconds in each window of the report
+        percentiles (tuple): percentiles (0-100) of test request latency to report
+
+        -- outputs --
+        report (dict): report of the run (without not_started)
+        '''
+        def latency(values):
+            values = sorted([value for value in values if value is not None])
+            out = {f'p{pct:g}': percentile(values, pct) for pct in percentiles}
+            out['max'] = values[-1] if len(values) > 0 else None
+            return out
+
+        def group_summary(group):
+            errors = sum([1 for record in group if record[2]])
+            return {
+                'chains': len(group),
+                'errors': errors,
+                'error_rate': errors / len(group) if len(group) > 0 else 0,
+                'latency': latency([record[4] for record in group])
+            }
+
+        report = {
+            'duration': duration,
+            'chains': len(records),
+            'throughput': len(records) / duration if duration > 0 else 0,
+            **{key: val for key, val in group_summary(records).items() if key != 'chains'},
+            'status_codes': {},
+            'by_test': {},
+            'windows': []
+        }
+        for record in records:
+            report['status_codes'][record[3]] = report['status_codes'].get(record[3], 0) + 1
+        for test_name in sorted(set([record[1] for record in records])):
+            report['by_test'][test_name] = group_summary([record for record in records if record[1] == test_name])
+
+        windows = {}
+        for record in records:
+            windows.setdefault(int(record[0] // window), []).append(record)
+        for i in range(int(duration // window) + 1 if duration > 0 else 0):
+            group = windows.get(i, [])
+            end = min((i + 1) * window, duration)
+            if end <= i * window:
+                continue
+            summary = group_summary(group)
+            report['windows'].append({
+                'start': i * window,
+                'end': end,
+                'chains': summary['chains'],
+                'throughput': summary['chains'] / (end - i * window),
+                'errors': summary['errors'],
+                'error_rate': summary['error_rate'],
+                **summary['latency']
+            })
+        return report
+
+    def tester_definition(self):
+        '''
+        creates a picklable dict of the inputs needed to create a copy of the object that runs the
+            same requests (e.g., in another process); results, logs, custom_tests, and progress
+            are not included
+
+        -- inputs --
+        None
+
+        -- outputs --
+        definition (dict): keyword inputs for APITester; the 'function' of predo, test, and undo is
+            replaced by its http method name when it is a requests function, and the default
+            transport is replaced by its pool_size and default_headers
+        '''
+        def api_definition(api_obj):
+            if api_obj is None:
+                return None
+            out = dict(api_obj)
+            method = request_method(api_obj['function'])
+            if method is not None:
+                out['function'] = method
+            return out
+
+        definition = {
+            'base_url': self.base_url,
+            'test_fields': self.test_fields,
+            'predo': api_definition(self.predo),
+            'test': api_definition(self.test),
+            'undo': api_definition(self.undo),
+            'custom_inputs': self.custom_inputs,
+            'matching_fields': self.matching_fields,
+            'delete_value': self.delete_value,
+            'print_status': self.print_status,
+            'print_json': self.print_json,
+            'print_progress': False,
+            'keep_responses': self.keep_responses,
+            'response_body_limit': self.response_body_limit,
+            'response_json': self.response_json,
+            'response_size_limit': self.response_size_limit,
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'retry_backoff': self.retry_backoff,
+            'rate_limit': self.rate_limiter,
+            'concurrency_controller': self.concurrency_controller,
+        }
+        if isinstance(self.transport, SessionTransport):
+            definition['pool_size'] = self.transport.pool_size
+            definition['default_headers'] = self.transport.default_headers
+        else:
+            definition['transport'] = self.transport
+        return definition
+
+    def _add_case_results(self, cases, outputs, start=0):
+        '''
+        adds the results of the cases of a test plan in order, adding each field's
+            tests_summary_by_field entry once its results are in; stops at the first 'api' case
+            whose result is not in yet so results can be added (and written to the sinks) while
+            the rest of the cases are still running
+
+        -- inputs --
+        cases (list): test cases in the form described in build_plan
+        outputs (list): result of each case (in the form of the result_template function), in the
+            same order as cases; None for 'api' cases that have not finished and ignored for
+            'summary' cases
+        start (int): index of the first case that has not been added
+
+        -- outputs --
+        next_index (int): index of the first case that has not been added
+        '''
+        for i in range(start, len(cases)):
+            case = cases[i]
+            if case['kind'] == 'summary':
+                self.add_summary(case)
+            elif case['kind'] == 'api' and outputs[i] is None:
+                return i
+            else:
+                self.add_result(outputs[i])
+        return len(cases)
+
+    def _run_independent_chain(self, case):
+        '''
+        runs one test case as an independent chain with its own log (see run_all_tests_async)
+
+        -- inputs --
+        case (dict): test case in the form of the case_template function
+
+        -- outputs --
+        result (dict): result of the chain in the form of the result_template function
+        '''
+        log = copy.deepcopy(self._log_init)
+        result = self.run_test_chain(case, log)
+        if self._final_undo_needed(log):
+            self.run_one_api('test', self._general_test_field, log=log, log_indices=case['log_indices'], decode=False)
+        return result
+
+    def run_fields_parallel(self, workers):
+        '''
+        runs all standard field-specific tests for every field in test_fields, testing up to
+            workers fields at one time, then adds the results and tests_summary_by_field entries
+            in test_fields order
+
+        -- inputs --
+        workers (int): number of fields to test at one time
+
+        -- outputs --
+        None
+
+        Notes: each field is tested by a worker copy of the object with its own log, test, results,
+        and progress bars, so fields cannot see each other's requests (the first test of each field
+        runs the predo); when test['final_undo'] is True, it is applied at the end of each field.
+        The API being tested must be able to handle workers requests at once. self.log is left as
+        the log of the last field.
+        '''
+        if workers < 1:
+            raise ValueError(f'workers must be at least 1 ({workers} provided)')
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._run_field_worker, i) for i in range(len(self.test_fields))]
+            for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                self.update_progress_bars({'l2': i, 'l3': -1})
+            field_workers = [future.result() for future in futures]
+
+        for field_worker in field_workers:
+            self.add_result(field_worker.results)
+            for summary in field_worker.tests_summary_by_field:
+                summary.update(self.result_counts.get(summary['field'], self._counts_init))
+                self._add_field_summary(summary)
+            self.l1_progress_bar['issues'] += field_worker.l3_progress_bar['issues']
+            self.l2_progress_bar['issues'] += field_worker.l3_progress_bar['issues']
+            self.deadline_reached = self.deadline_reached or field_worker.deadline_reached
+        self.log = field_workers[-1].log
+        return
+
+    def _run_field_worker(self, index):
+        '''
+        runs all standard field-specific tests for one field on a worker copy of the object (see
+            run_fields_parallel)
+
+        -- inputs --
+        index (int): index of the field of focus in the test_fields array
+
+        -- outputs --
+        field_worker (APITester): worker copy holding the log, results, tests_summary_by_field, and
+            progress bars of the field
+        '''
+        field_worker = copy.copy(self)
+        field_worker.test = copy.deepcopy(self.test)
+        field_worker._templates = dict(self._templates)
+        field_worker.log = copy.deepcopy(self._log_init)
+        field_worker.results = []
+        field_worker.sinks = []
+        # results are passed to after_result hooks when they are added to this object
+        field_worker.hooks = dict(self.hooks, after_result=[])
+        field_worker.keep_results = True
+        field_worker.result_counts = {}
+        field_worker.result_timings = []
+        field_worker.tests_summary = {}
+        field_worker.failed_predo = []
+        field_worker.failed_test = []
+        field_worker.failed_undo = []
+        field_worker.current_result = {}
+        field_worker.tests_summary_by_field = []
+        field_worker.print_progress = False
+        field_worker._progress_renderer = None
+        field_worker.l1_progress_bar = copy.deepcopy(self.l1_progress_bar)
+        field_worker.l2_progress_bar = copy.deepcopy(self.l2_progress_bar)
+        field_worker.l3_progress_bar = copy.deepcopy(self.l3_progress_bar)
+        field_worker.l2_progress_bar['current_step'] = index - 1
+        field_worker.l3_progress_bar['current_step'] = -1
+        field_worker.l3_progress_bar['issues'] = 0
+
+        field_worker.run_one_field(index)
+        if field_worker._final_undo_needed(field_worker.log):
+            field_worker.run_one_api('test', self._general_test_field, decode=False)
+        return field_worker
+
+    def run_custom_tests(self):
+        '''
+        runs all tests specified by the custom_tests attribute and adds their output to the results;
+            once the run deadline is reached, the remaining custom tests are added as not run
+            (named after their function) instead
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
         if len(self.custom_tests) > 0:
             self.l1_progress_bar['suffix'] = ' {} / {} running custom functions tests'
             self.l2_progress_bar['active'] = True
             self.l2_progress_bar['progress_bar'].steps = len(self.custom_tests)
             for i, test in enumerate(self.custom_tests):
                 self.l2_progress_bar['suffix'] = ' {} / {} custom tests'
+                remaining = self.deadline_remaining()
+                if remaining is not None and remaining <= 0:
+                    self.deadline_reached = True
+                    self.add_result(result_template(
+                        False,
+                        None,
+                        getattr(test['function'], '__name__', 'custom test'),
+                        '',
+                        self._general_test_field,
+                        predo_status=self._not_run_status,
+                        test_status=self._not_run_status,
+                        undo_status=self._not_run_status,
+                        test_source='Custom Tests'
+                    ))
+                    continue
                 custom_tests_out = test['function'](test['inputs'], self)
                 self.add_result(custom_tests_out)
+        return
 
-        # process results -------------------------------------------------------------------------
-        self.l1_progress_bar['current_step'] += custom_contribution
-        self.update_progress_bars()
-
-        tests_summary = {
-            'passed_tests': sum([obj['passed_tests'] for obj in self.tests_summary_by_field]),
-            'total_tests': sum([obj['total_tests'] for obj in self.tests_summary_by_field]),
-            'expected_tests': sum([obj['expected_tests'] for obj in self.tests_summary_by_field])
-        }
+    def summarize_results(self):
+        '''
+        sythesizes results into tests_summary, failed_predo, failed_test, and failed_undo; these
+            are kept up to date as each result and tests_summary_by_field entry is added, so this
+            only fills in any counts that are still missing (e.g., when no fields were summarized)
 
-        self.tests_summary = tests_summary
-        self.failed_predo = [val for val in self.results if hasattr(val['predo_response'], 'status_code') and val['predo_response'].status_code // 100 != 2]
-        self.failed_test = [val for val in self.results if not val['expected_result']]
-        self.failed_undo = [val for val in self.results if hasattr(val['undo_response'], 'status_code') and val['undo_response'].status_code // 100 != 2]
+        -- inputs --
+        None
 
-        # reset print statuses --------------------------------------------------------------------
-        if print_status_override:
-            self.print_status = original_ps
-        if print_json_override:
-            self.print_json = original_pj
+        -- outputs --
+        None
+        '''
+        for key in ['passed_tests', 'total_tests', 'throttled', 'expected_tests']:
+            self.tests_summary.setdefault(key, 0)
         return
     
     def clear_results(self):
@@ -1572,11 +3389,14 @@ class APITester():
         None
         '''
         self.tests_summary = {}
-        self.log = self._log_init
-        self.l1_progress_bar = self._l1_init
-        self.l2_progress_bar = self._l2_init
-        self.l3_progress_bar = self._l3_init
+        self.log = copy.deepcopy(self._log_init)
+        self.l1_progress_bar = self.new_progress_bar_dict(self._l1_init)
+        self.l2_progress_bar = self.new_progress_bar_dict(self._l2_init)
+        self.l3_progress_bar = self.new_progress_bar_dict(self._l3_init)
         self.results = []
+        self.result_counts = {}
+        self.result_timings = []
+        self._predo_cache = {}
         self.tests_summary_by_field = []
         self.failed_predo = []
         self.failed_test = []
@@ -1601,3 +3421,73 @@ class APITester():
         self.clear_results()
         self.run_all_tests()
         return
+
+    def close(self):
+        '''
+        closes the transport (and any pooled connections) and the sinks
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+        self.close_sinks()
+        return
+
+    def close_sinks(self):
+        '''
+        writes any results buffered by the sinks and closes them; run automatically when a run
+            (run_all_tests, run_all_tests_async, or run_all_tests_sharded) raises
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        for sink in self.sinks:
+            sink.close()
+        return
+
+    def flush_sinks(self):
+        '''
+        writes any results buffered by the sinks; run automatically at the end of every run
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        for sink in self.sinks:
+            sink.flush()
+        return
+
+## -----------------------------------------------------------------------------
+
+def _run_shard(definition, cases, deadline_at=None):
+    '''
+    runs a shard of test cases as independent chains in a worker process (see
+        APITester.run_all_tests_sharded)
+
+    definition (dict): keyword inputs for APITester from APITester.tester_definition
+    cases (list): test cases in the form of the case_template function
+    deadline_at (float): time.time() value of the run deadline (None if there is none)
+    
+    returns a list of the result of each case, the number of issues that occured, whether the
+        deadline was reached, and the unused fixtures of the shard's fixture pool
+    '''
+    tester = APITester(**definition)
+    tester._deadline_at = deadline_at
+    try:
+        tester.start_fixture_pool()
+        if tester._fixture_pool is not None:
+            tester._fixture_pool.allow(len(cases))
+        results = [tester._run_independent_chain(case) for case in cases]
+    finally:
+        tester.stop_fixture_pool()
+        tester.close()
+    return results, tester.l3_progress_bar['issues'], tester.deadline_reached, tester.unused_fixtures
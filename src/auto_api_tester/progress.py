@@ -0,0 +1,132 @@
+import threading
+
+## -----------------------------------------------------------------------------
+
+class ProgressRenderer():
+    '''
+    Prints the progress bars of an APITester from a background thread, sampling their current
+        state at a fixed rate so that the thread running the tests only updates counters and never
+        waits on printing
+
+    -- input attributes --
+    tester (APITester): object whose progress bars are printed (see APITester.render_progress_bars)
+    interval (float): number of seconds between samples; progress is only printed if it has been
+        updated since the last sample
+
+    -- non-input attributes --
+    dirty (bool): whether progress has been updated since it was last printed; set by
+        APITester.update_progress_bars
+
+    -- methods --
+    start: starts the background thread
+    stop: stops the background thread, printing any progress that has not been printed yet
+    '''
+    def __init__(self, tester, interval=0.04):
+        self.tester = tester
+        self.interval = interval
+        self.dirty = False
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        return
+
+    def start(self):
+        '''
+        starts the background thread
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='auto-api-tester-progress', daemon=True)
+        self._thread.start()
+        return
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._render()
+        return
+
+    def _render(self):
+        if self.dirty:
+            self.dirty = False
+            self.tester.render_progress_bars()
+        return
+
+    def stop(self):
+        '''
+        stops the background thread, printing any progress that has not been printed yet
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self._render()
+        return
+
+## -----------------------------------------------------------------------------
+
+class HeadlessBar():
+    '''
+    A plain text stand-in for a TimerBar used when running headless (e.g., in CI) so that neither
+        timer_bar nor IPython need to be imported; has the parts of the TimerBar interface used
+        by APITester
+
+    -- input attributes --
+    steps (integer): total number of iterations in the process
+    suffix_text (string): text printed for the bar (e.g., ' 2 / 4 fields tested (0 issues)')
+
+    -- methods --
+    text_at_step: returns the text of the bar
+    suffix_update: updates suffix_text
+    '''
+    def __init__(self, steps, suffix_text=''):
+        self.steps = steps
+        self.suffix_text = suffix_text
+        return
+
+    def text_at_step(self, step):
+        '''
+        returns the text of the bar (step is shown by suffix_text)
+
+        -- inputs --
+        step (integer): current step
+
+        -- outputs --
+        text (string): suffix_text without surrounding whitespace
+        '''
+        return self.suffix_text.strip()
+
+    def suffix_update(self, suffix_text):
+        '''
+        updates suffix_text
+
+        -- inputs --
+        suffix_text (string): new suffix_text
+
+        -- outputs --
+        None
+        '''
+        self.suffix_text = suffix_text
+        return
+
+def new_progress_bar(headless=False):
+    '''
+    creates the progress bar object of an APITester progress bar dict, importing timer_bar only
+        when it is needed
+
+    headless (bool): create a plain text HeadlessBar instead of a TimerBar
+    '''
+    if headless:
+        return HeadlessBar(steps=0)
+    from timer_bar import TimerBar
+    return TimerBar(steps=0, print_after=True)
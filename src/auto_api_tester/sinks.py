@@ -0,0 +1,127 @@
+import json
+import time
+import threading
+
+from .utils import ResponseSummary, summarize_response
+
+## -----------------------------------------------------------------------------
+
+def result_record(result, body_limit=1000):
+    '''
+    creates a json serializable copy of a result; responses are replaced by a dict of their
+        ResponseSummary (see summarize_response) and any other value that cannot be serialized is
+        written as a string when the record is dumped
+
+    result (dict): result in the form of the result_template function
+    body_limit (int): max number of characters of a full response's body to keep (None to keep all)
+    '''
+    record = dict(result)
+    for api in ['predo', 'test', 'undo']:
+        response = record.get(f'{api}_response')
+        if response is None:
+            continue
+        if not isinstance(response, ResponseSummary):
+            response = summarize_response(response, body_limit)
+        record[f'{api}_response'] = {
+            'status_code': response.status_code,
+            'elapsed': response.elapsed.total_seconds() if response.elapsed is not None else None,
+            'text': response.text,
+            'truncated': response.truncated
+        }
+    return record
+
+## -----------------------------------------------------------------------------
+
+class JSONLSink():
+    '''
+    Writes each result added to an APITester to a JSON Lines file (one json object per line) as
+        soon as it is added, so results are kept on disk throughout a run and the file can be
+        followed (e.g., `tail -f`) while the tests run
+
+    -- input attributes --
+    path (string): path of the file to write to
+    buffer_size (integer): max number of results held before they are written to the file
+        (1 writes every result as soon as it is added)
+    flush_interval (float): max number of seconds a result is held before it is written to the
+        file (checked whenever a result is added)
+    append (bool): add to the end of an existing file instead of overwriting it
+    body_limit (integer): max number of characters of a full response's body to write (None to
+        write all); bodies of responses already summarized are written as kept
+
+    -- methods --
+    write: adds one result to the buffer, writing the buffer to the file if it is full
+    flush: writes any buffered results to the file
+    close: writes any buffered results and closes the file
+    '''
+    def __init__(self, path, buffer_size=100, flush_interval=1.0, append=False, body_limit=1000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.append = append
+        self.body_limit = body_limit
+
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._buffer = []
+        self._last_flush = time.perf_counter()
+        self._lock = threading.Lock()
+        return
+
+    def write(self, result):
+        '''
+        adds one result to the buffer, writing the buffer to the file if it is full or if
+            flush_interval has passed since it was last written; a closed sink reopens its file
+            to append to it (e.g., for a run after one that raised)
+
+        -- inputs --
+        result (dict): result in the form of the result_template function
+
+        -- outputs --
+        None
+        '''
+        line = json.dumps(result_record(result, self.body_limit), default=str)
+        with self._lock:
+            if self._file.closed:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size or time.perf_counter() - self._last_flush >= self.flush_interval:
+                self._flush()
+        return
+
+    def flush(self):
+        '''
+        writes any buffered results to the file
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+        return
+
+    def _flush(self):
+        if len(self._buffer) > 0:
+            self._file.write('\n'.join(self._buffer) + '\n')
+            self._buffer = []
+        self._file.flush()
+        self._last_flush = time.perf_counter()
+        return
+
+    def close(self):
+        '''
+        writes any buffered results and closes the file
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+        return
@@ -0,0 +1,174 @@
+import time
+import threading
+
+## -----------------------------------------------------------------------------
+
+class TokenBucket():
+    '''
+    Limits the rate requests are sent at: each request takes a token, tokens are added at rate per
+        second, and up to burst tokens can be saved up, so that no more than rate requests per
+        second are sent on average (with short bursts of up to burst requests)
+
+    -- input attributes --
+    rate (float): max number of requests per second
+    burst (integer): max number of tokens saved up; default 1 spaces requests evenly, never
+        sending more than rate requests in any second
+
+    -- methods --
+    acquire: takes a token, waiting for one if needed
+    '''
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError(f'rate must be greater than 0 ({rate} provided)')
+        self.rate = rate
+        self.burst = burst if burst is not None else 1
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        return
+
+    def __getstate__(self):
+        # locks cannot be pickled (e.g., to send the bucket to the processes of run_all_tests_sharded)
+        return {'rate': self.rate, 'burst': self.burst}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+        return
+
+    def acquire(self):
+        '''
+        takes a token, waiting for one if needed
+
+        -- inputs --
+        None
+
+        -- outputs --
+        waited (float): seconds waited for the token
+        '''
+        waited = 0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+## -----------------------------------------------------------------------------
+
+class AIMDController():
+    '''
+    Limits the number of requests in flight at one time, adapting the limit the way TCP adapts its
+        congestion window (additive increase, multiplicative decrease): the limit grows by
+        increase for each limit's worth of requests that succeed and is multiplied by decrease
+        when a response is throttled (429), a server error (5xx), a transport error, or (if
+        latency_factor is set) much slower than usual; it is decreased at most once for the
+        requests that were already in flight when it was last decreased
+
+    -- input attributes --
+    initial (integer): limit to start at
+    min_limit (integer): lowest the limit can go
+    max_limit (integer): highest the limit can go
+    increase (float): amount the limit grows for each limit's worth of successful requests
+    decrease (float): factor the limit is multiplied by on congestion (between 0 and 1)
+    latency_factor (float): a response is treated as congestion if it takes more than this many
+        times the moving average response time (None to not use response times)
+
+    -- non-input attributes --
+    limit (float): current limit (requests in flight are limited to limit rounded down)
+    in_flight (integer): number of requests in flight
+    history (list): (time.perf_counter() value, limit) of each decrease of the limit and each
+        increase to the next whole number
+
+    -- methods --
+    acquire: waits until a request can be sent and marks it in flight
+    release: marks a request as done and adapts the limit based on its outcome
+    '''
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1, decrease=0.5, latency_factor=None):
+        if not (1 <= min_limit <= initial <= max_limit):
+            raise ValueError(f'limits must have 1 <= min_limit <= initial <= max_limit ({min_limit}, {initial}, {max_limit} provided)')
+        if not (0 < decrease < 1):
+            raise ValueError(f'decrease must be between 0 and 1 ({decrease} provided)')
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.history = [(time.perf_counter(), self.limit)]
+
+        self._condition = threading.Condition()
+        self._sent = 0
+        self._last_decrease = 0
+        self._average_elapsed = None
+        return
+
+    def __getstate__(self):
+        # conditions cannot be pickled; a copy starts from the current limit
+        return {'initial': max(self.min_limit, min(self.max_limit, int(self.limit))), 'min_limit': self.min_limit,
+                'max_limit': self.max_limit, 'increase': self.increase, 'decrease': self.decrease,
+                'latency_factor': self.latency_factor}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+        return
+
+    def acquire(self):
+        '''
+        waits until fewer requests than the limit are in flight and marks one more in flight
+
+        -- inputs --
+        None
+
+        -- outputs --
+        ticket (int): number of the request; pass to release
+        '''
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            self._sent += 1
+            return self._sent
+
+    def release(self, ticket, status_code=None, elapsed=None):
+        '''
+        marks a request as done and adapts the limit based on its outcome
+
+        -- inputs --
+        ticket (int): number of the request from acquire
+        status_code (int): status code of the response (None after a transport error)
+        elapsed (float): seconds the request took
+
+        -- outputs --
+        None
+        '''
+        with self._condition:
+            self.in_flight -= 1
+            congested = status_code is None or status_code == 429 or status_code // 100 == 5
+            if not congested and elapsed is not None and self.latency_factor is not None:
+                if self._average_elapsed is not None and elapsed > self.latency_factor * self._average_elapsed:
+                    congested = True
+                else:
+                    self._average_elapsed = elapsed if self._average_elapsed is None else 0.9 * self._average_elapsed + 0.1 * elapsed
+
+            if congested:
+                # requests sent before the last decrease already count towards it
+                if ticket > self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = self._sent
+                    self.history.append((time.perf_counter(), self.limit))
+            elif self.limit < self.max_limit:
+                previous = int(self.limit)
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                if int(self.limit) != previous:
+                    self.history.append((time.perf_counter(), self.limit))
+            self._condition.notify_all()
+        return
@@ -0,0 +1,111 @@
+import os
+import json
+import threading
+
+## -----------------------------------------------------------------------------
+
+class ChromeTraceExporter():
+    '''
+    Records the plans, api requests, and results of an APITester through its hooks and writes them
+        as a Chrome trace (json timeline that can be opened in chrome://tracing or
+        https://ui.perfetto.dev) to see where time goes across predo/test/undo chains
+
+    -- input attributes --
+    path (string): path of the file the trace is written to
+
+    -- non-input attributes --
+    events (list): trace events recorded so far
+
+    -- methods --
+    register: adds the hooks that record events to an APITester
+    write: writes the events recorded so far to path
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        return
+
+    def register(self, tester):
+        '''
+        adds the hooks that record events to an APITester
+
+        -- inputs --
+        tester (APITester): object whose runs should be recorded
+
+        -- outputs --
+        exporter (ChromeTraceExporter): this object (e.g., for
+            `exporter = ChromeTraceExporter('trace.json').register(tester)`)
+        '''
+        tester.add_hook('after_plan', self._record_plan)
+        tester.add_hook('after_api', self._record_api)
+        tester.add_hook('after_result', self._record_result)
+        return self
+
+    def _add(self, event):
+        with self._lock:
+            self.events.append(event)
+        return
+
+    def _record_plan(self, info):
+        self._add({
+            'name': f"plan {info['plan']}",
+            'cat': 'plan',
+            'ph': 'X',
+            'ts': info['start'] * 1e6,
+            'dur': info['elapsed'] * 1e6,
+            'pid': self._pid,
+            'tid': info['thread'],
+            'args': {'cases': len(info['cases'])}
+        })
+        return
+
+    def _record_api(self, info):
+        self._add({
+            'name': f"{info['api']} {info['test_name']}" if info['test_name'] is not None else info['api'],
+            'cat': info['api'],
+            'ph': 'X',
+            'ts': info['start'] * 1e6,
+            'dur': info['elapsed'] * 1e6,
+            'pid': self._pid,
+            'tid': info['thread'],
+            'args': {
+                'field': info['field'],
+                'url': info['api_input']['url'],
+                'status_code': getattr(info['response'], 'status_code', None),
+                'ttfb_ms': info['ttfb'] * 1000 if info['ttfb'] is not None else None,
+                'wait_ms': info['wait'] * 1000
+            }
+        })
+        return
+
+    def _record_result(self, info):
+        self._add({
+            'name': f"result {info['test_name']}",
+            'cat': 'result',
+            'ph': 'i',
+            's': 't',
+            'ts': info['time'] * 1e6,
+            'pid': self._pid,
+            'tid': info['thread'],
+            'args': {'field': info['field'], 'expected_result': info['result']['expected_result']}
+        })
+        return
+
+    def write(self):
+        '''
+        writes the events recorded so far to path
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        with self._lock:
+            events = list(self.events)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return
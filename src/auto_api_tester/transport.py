@@ -0,0 +1,504 @@
+import io
+import sys
+import json
+import time
+import asyncio
+import datetime
+import requests
+import threading
+import concurrent.futures
+
+from urllib.parse import urlsplit, unquote
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+## -----------------------------------------------------------------------------
+
+_methods = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
+
+def request_method(function):
+    '''
+    finds the http method name for the 'function' value of a predo, test, or undo
+
+    function (string or function): http method name (e.g., 'get', 'POST') or a requests function
+        (e.g., requests.get, requests.post)
+
+    returns the lower case method name, or None if function is some other callable that should be
+        called directly
+    '''
+    if isinstance(function, str):
+        if function.lower() not in _methods:
+            raise ValueError(f"'{function}' is not an http method name (should be one of {_methods})")
+        return function.lower()
+    if getattr(function, '__module__', None) == 'requests.api' and function.__name__ in _methods:
+        return function.__name__
+    return None
+
+## -----------------------------------------------------------------------------
+
+class SessionTransport():
+    '''
+    Sends API requests through a pooled requests.Session so that connections are kept alive and
+        reused across predo, test, and undo requests instead of opened fresh for every call
+
+    -- input attributes --
+    pool_size (integer): max number of connections kept open per host; should be at least the
+        number of requests run at one time (e.g., max_concurrency of run_all_tests_async)
+    default_headers (dict): headers sent with every request (merged with, and overridden by, the
+        header of each request)
+    keep_alive (bool): keep connections open between requests; if False, every request asks the
+        server to close the connection once it has responded
+    session (requests.Session): session to send requests through; a new session is created if
+        not provided
+    max_body_size (int): max number of bytes of each response body that are read; the rest of a
+        longer body is not downloaded, the response's body_truncated attribute is set to True,
+        and its connection is closed instead of reused (None reads every body in full)
+
+    -- methods --
+    request: sends one request and returns the response
+    close: closes the session and any pooled connections
+    '''
+    def __init__(self, pool_size=10, default_headers=None, keep_alive=True, session=None, max_body_size=None):
+        self.pool_size = pool_size
+        self.default_headers = default_headers if default_headers is not None else {}
+        self.keep_alive = keep_alive
+        self.max_body_size = max_body_size
+        self.session = session if session is not None else requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.default_headers)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        return
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        '''
+        sends one request and returns the response
+
+        -- inputs --
+        method (string): http method name (e.g., 'get', 'post')
+        url (string): full url of the request
+        headers (dict): header of the request
+        json (dict): body of the request
+        timeout (float or tuple): seconds, or a (connect, read) tuple, to wait for the response
+            (None to wait forever)
+
+        -- outputs --
+        response (requests.Response): response of the request
+        '''
+        if self.max_body_size is None:
+            return self.session.request(method.upper(), url, headers=headers, json=json, timeout=timeout)
+
+        response = self.session.request(method.upper(), url, headers=headers, json=json, timeout=timeout, stream=True)
+        content = bytearray()
+        response.body_truncated = False
+        for chunk in response.iter_content(chunk_size=65536):
+            content += chunk
+            if len(content) > self.max_body_size:
+                response.body_truncated = True
+                del content[self.max_body_size:]
+                break
+        response._content = bytes(content)
+        response._content_consumed = True
+        if response.body_truncated:
+            response.close()
+        return response
+
+    def close(self):
+        '''
+        closes the session and any pooled connections
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        self.session.close()
+        return
+
+## -----------------------------------------------------------------------------
+
+class InProcessResponse():
+    '''
+    Response of a request made to an app in-process (see WSGITransport and ASGITransport) with the
+        parts of the requests.Response interface used by APITester
+
+    -- input attributes --
+    status_code (int): status code of the response
+    headers (CaseInsensitiveDict): headers of the response
+    content (bytes): body of the response
+    url (string): full url of the request
+    elapsed (datetime.timedelta): time between sending the request and the app starting its
+        response
+    reason (string): reason phrase of the status (e.g., 'OK'), if the app provided one
+
+    -- methods --
+    encoding: charset of the Content-Type header (default 'utf-8')
+    text: body of the response decoded as a string
+    ok: whether the status code is below 400
+    json: decodes the body of the response as json
+    '''
+    def __init__(self, status_code, headers, content, url, elapsed, reason=''):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.elapsed = elapsed
+        self.reason = reason
+        return
+
+    def __repr__(self):
+        return f'<InProcessResponse [{self.status_code}]>'
+
+    @property
+    def encoding(self):
+        content_type = self.headers.get('Content-Type', '')
+        for param in content_type.split(';')[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"')
+        return 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        '''
+        decodes the body of the response as json, raising a ValueError if it is not json
+
+        -- inputs --
+        None
+
+        -- outputs --
+        out_json (misc): decoded body of the response
+        '''
+        return json.loads(self.content)
+
+def _encode_request(url, headers, body, default_headers):
+    # splits the url and builds the headers and body the same way requests would for json=body
+    parts = urlsplit(url)
+    request_headers = CaseInsensitiveDict(default_headers)
+    request_headers.update(headers if headers is not None else {})
+    content = b''
+    if body is not None:
+        content = json.dumps(body).encode('utf-8')
+        request_headers.setdefault('Content-Type', 'application/json')
+    if content:
+        request_headers['Content-Length'] = str(len(content))
+    request_headers.setdefault('Host', parts.netloc)
+    return parts, request_headers, content
+
+def _server_address(parts):
+    # (host, port) the request was sent to
+    port = parts.port if parts.port is not None else (443 if parts.scheme == 'https' else 80)
+    return parts.hostname or 'localhost', port
+
+## -----------------------------------------------------------------------------
+
+class WSGITransport():
+    '''
+    Sends API requests to a WSGI app (e.g., a Flask app) by calling it in this process, so that no
+        server is started and no socket is opened; the base_url of the tester only sets the host
+        the app sees (e.g., 'http://testserver')
+
+    -- input attributes --
+    app (callable): WSGI app
+    default_headers (dict): headers sent with every request (merged with, and overridden by, the
+        header of each request)
+    script_name (string): path the app is mounted at (removed from the start of each url path)
+
+    -- methods --
+    request: sends one request and returns the response
+    close: does nothing (there are no connections to close)
+    '''
+    def __init__(self, app, default_headers=None, script_name=''):
+        self.app = app
+        self.default_headers = default_headers if default_headers is not None else {}
+        self.script_name = script_name.rstrip('/')
+        return
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        '''
+        sends one request and returns the response
+
+        -- inputs --
+        method (string): http method name (e.g., 'get', 'post')
+        url (string): full url of the request
+        headers (dict): header of the request
+        json (dict): body of the request
+        timeout (float or tuple): not used; the app is called in this thread, so it cannot be
+            stopped part way through
+
+        -- outputs --
+        response (InProcessResponse): response of the request
+        '''
+        parts, request_headers, content = _encode_request(url, headers, json, self.default_headers)
+        host, port = _server_address(parts)
+        path = unquote(parts.path) or '/'
+        if self.script_name and path.startswith(self.script_name):
+            path = path[len(self.script_name):]
+
+        environ = {
+            'REQUEST_METHOD': method.upper(),
+            'SCRIPT_NAME': self.script_name,
+            'PATH_INFO': path,
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': host,
+            'SERVER_PORT': str(port),
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': parts.scheme or 'http',
+            'wsgi.input': io.BytesIO(content),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+        for key, value in request_headers.items():
+            key = key.upper().replace('-', '_')
+            if key in ['CONTENT_TYPE', 'CONTENT_LENGTH']:
+                environ[key] = str(value)
+            else:
+                environ[f'HTTP_{key}'] = str(value)
+
+        start = time.perf_counter()
+        status = {}
+        chunks = []
+
+        def start_response(status_line, response_headers, exc_info=None):
+            if exc_info is not None and 'line' in status:
+                raise exc_info[1].with_traceback(exc_info[2])
+            status['line'] = status_line
+            status['headers'] = response_headers
+            status['elapsed'] = time.perf_counter() - start
+            return chunks.append
+
+        result = self.app(environ, start_response)
+        try:
+            for chunk in result:
+                chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        code, _, reason = status['line'].partition(' ')
+        return InProcessResponse(
+            int(code),
+            CaseInsensitiveDict(status['headers']),
+            b''.join(chunks),
+            url,
+            datetime.timedelta(seconds=status['elapsed']),
+            reason
+            )
+
+    def close(self):
+        '''
+        does nothing (there are no connections to close); here so the transport can be used in
+            place of a SessionTransport
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        return
+
+## -----------------------------------------------------------------------------
+
+class ASGITransport():
+    '''
+    Sends API requests to an ASGI app (e.g., a FastAPI or Starlette app) by calling it in this
+        process, so that no server is started and no socket is opened; the base_url of the tester
+        only sets the host the app sees (e.g., 'http://testserver'). The app is run on an event
+        loop in a background thread that is started by the first request, so requests can be sent
+        from any thread (including the chains of run_all_tests_async)
+
+    -- input attributes --
+    app (callable): ASGI app
+    default_headers (dict): headers sent with every request (merged with, and overridden by, the
+        header of each request)
+    root_path (string): path the app is mounted at
+    lifespan (bool): send the app lifespan startup events before the first request and shutdown
+        events on close (e.g., so FastAPI startup handlers are run)
+
+    -- methods --
+    request: sends one request and returns the response
+    close: runs the lifespan shutdown (if lifespan) and stops the background event loop
+    '''
+    def __init__(self, app, default_headers=None, root_path='', lifespan=True):
+        self.app = app
+        self.default_headers = default_headers if default_headers is not None else {}
+        self.root_path = root_path.rstrip('/')
+        self.lifespan = lifespan
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._state = {}
+        self._lifespan_receive = None
+        self._lifespan_events = None
+        self._lifespan_task = None
+        return
+
+    def _run(self, coroutine, timeout=None):
+        # runs a coroutine on the background event loop, starting it (and the lifespan) if needed
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='auto-api-tester-asgi', daemon=True)
+                self._thread.start()
+                if self.lifespan:
+                    asyncio.run_coroutine_threadsafe(self._startup(), self._loop).result()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def _startup(self):
+        self._lifespan_receive = asyncio.Queue()
+        self._lifespan_events = asyncio.Queue()
+
+        async def run_lifespan():
+            scope = {'type': 'lifespan', 'asgi': {'version': '3.0', 'spec_version': '2.0'}, 'state': self._state}
+            try:
+                await self.app(scope, self._lifespan_receive.get, self._lifespan_events.put)
+            except Exception:
+                # apps that do not support lifespan may raise; they are used without it
+                pass
+            await self._lifespan_events.put({'type': 'lifespan.finished'})
+
+        self._lifespan_task = asyncio.ensure_future(run_lifespan())
+        await self._lifespan_receive.put({'type': 'lifespan.startup'})
+        message = await self._lifespan_events.get()
+        if message['type'] == 'lifespan.finished':
+            self._lifespan_task = None
+        elif message['type'] == 'lifespan.startup.failed':
+            raise RuntimeError(f"ASGI app lifespan startup failed: {message.get('message', '')}")
+        return
+
+    async def _shutdown(self):
+        if self._lifespan_task is None:
+            return
+        await self._lifespan_receive.put({'type': 'lifespan.shutdown'})
+        message = await self._lifespan_events.get()
+        await self._lifespan_task
+        self._lifespan_task = None
+        if message['type'] == 'lifespan.shutdown.failed':
+            raise RuntimeError(f"ASGI app lifespan shutdown failed: {message.get('message', '')}")
+        return
+
+    async def _request(self, method, url, headers, body):
+        parts, request_headers, content = _encode_request(url, headers, body, self.default_headers)
+        path = unquote(parts.path) or '/'
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0', 'spec_version': '2.3'},
+            'http_version': '1.1',
+            'method': method.upper(),
+            'scheme': parts.scheme or 'http',
+            'path': path,
+            'raw_path': (parts.path or '/').encode('latin-1'),
+            'query_string': parts.query.encode('latin-1'),
+            'root_path': self.root_path,
+            'headers': [(key.lower().encode('latin-1'), str(value).encode('latin-1')) for key, value in request_headers.items()],
+            'client': ('127.0.0.1', 50000),
+            'server': _server_address(parts),
+            'state': dict(self._state)
+        }
+
+        start = time.perf_counter()
+        response_done = asyncio.Event()
+        request_sent = [False]
+        status = {}
+        chunks = []
+
+        async def receive():
+            if not request_sent[0]:
+                request_sent[0] = True
+                return {'type': 'http.request', 'body': content, 'more_body': False}
+            await response_done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                status['headers'] = [(key.decode('latin-1'), value.decode('latin-1')) for key, value in message.get('headers', [])]
+                status['elapsed'] = time.perf_counter() - start
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    response_done.set()
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            # an app may raise after sending its error response (e.g., Starlette's 500 response)
+            if 'code' not in status:
+                raise
+        finally:
+            response_done.set()
+
+        return InProcessResponse(
+            status['code'],
+            CaseInsensitiveDict(status['headers']),
+            b''.join(chunks),
+            url,
+            datetime.timedelta(seconds=status['elapsed'])
+            )
+
+    def request(self, method, url, headers=None, json=None, timeout=None):
+        '''
+        sends one request and returns the response
+
+        -- inputs --
+        method (string): http method name (e.g., 'get', 'post')
+        url (string): full url of the request
+        headers (dict): header of the request
+        json (dict): body of the request
+        timeout (float or tuple): seconds to wait for the response, or a (connect, read) tuple
+            whose values are added together (None to wait forever); the app is cancelled and a
+            TimeoutError is raised if it takes longer
+
+        -- outputs --
+        response (InProcessResponse): response of the request
+        '''
+        if isinstance(timeout, tuple):
+            timeout = sum([val for val in timeout if val is not None]) if any([val is not None for val in timeout]) else None
+        return self._run(self._request(method, url, headers, json), timeout)
+
+    def close(self):
+        '''
+        runs the lifespan shutdown (if lifespan) and stops the background event loop; the next
+            request starts them again
+
+        -- inputs --
+        None
+
+        -- outputs --
+        None
+        '''
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+                self._loop = None
+                self._thread = None
+        return
@@ -1,4 +1,5 @@
 import copy
+import functools
 import datetime as dt
 
 def change_date(date_string, days_diff, input_form='%Y-%m-%d'):
@@ -28,6 +29,197 @@ def test_boundary(val, change, test_type):
         return [val + change]
     return val + change
 
+def lengthen_value(val):
+    '''
+    adds a character to the end of a string value (used as a referenced value 'function' in
+        general tests; defined here rather than inline so test cases can be pickled)
+
+    val (string): value to be lengthened
+    '''
+    return val + 'a'
+
+def shorten_value(val):
+    '''
+    shortens a string value to its last character (used as a referenced value 'function' in
+        general tests; defined here rather than inline so test cases can be pickled)
+
+    val (string): value to be shortened
+    '''
+    return val[-1]
+
+class FieldPath():
+    '''
+    A parsed field directory (e.g., 'a.b[2].c') that can be used to get, check, set, or delete the
+        value at that location of an object without parsing the directory again; should be created
+        with compile_field so that each directory is only parsed once
+
+    -- input attributes --
+    field (string): directory of value (use "." to get to nested layers and [<ind>] to get the
+        <ind> index of an array within an object)
+
+    -- non-input attributes --
+    keys (tuple): (key, index) pair for each layer of field; index is None unless the layer
+        accesses an index of an array (e.g., 'b[2]' --> ('b', 2))
+
+    -- methods --
+    exists: checks to see if the field exists in an object
+    get: gets the value of the field in an object
+    set: sets the value of the field in an object (in place)
+    delete: deletes the field from an object (in place)
+    updated: creates a copy of an object with the field set or deleted, copying only the layers
+        along the field's directory
+    '''
+    __slots__ = ('field', 'keys')
+
+    def __init__(self, field):
+        self.field = field
+        keys = []
+        for key in field.split('.'):
+            if key.endswith(']'):
+                array_key, index_str = key[:-1].split('[')
+                keys.append((array_key, int(index_str)))
+            else:
+                keys.append((key, None))
+        self.keys = tuple(keys)
+
+    def __repr__(self):
+        return f'FieldPath({self.field!r})'
+
+    def get(self, obj, default=None):
+        '''
+        gets the value of the field in an object
+
+        obj (dict): object containing value to be found
+        default (any): value returned if the field does not exist in obj
+        '''
+        for key, index in self.keys:
+            if key not in obj:
+                return default
+            obj = obj[key]
+            if index is not None:
+                if not isinstance(obj, list) or len(obj) <= index:
+                    return default
+                obj = obj[index]
+        return obj
+
+    def exists(self, obj):
+        '''
+        checks to see if the field exists in an object
+
+        obj (dict): object to be checked
+        '''
+        return self.get(obj, _missing) is not _missing
+
+    def _parent(self, obj):
+        # walks to the object holding the last layer, creating missing layers along the way
+        for key, index in self.keys[:-1]:
+            if index is not None:
+                if key not in obj:
+                    obj[key] = []  # Create an empty list if the array key doesn't exist
+                obj = obj[key]
+                if index >= len(obj):
+                    obj.extend([None] * (index + 1 - len(obj)))  # Extend the list if the index is out of range
+                obj = obj[index]
+            else:
+                if key not in obj:
+                    obj[key] = {}  # Create an empty dictionary if the key doesn't exist
+                obj = obj[key]
+        return obj
+
+    def set(self, obj, new_value):
+        '''
+        sets the value of the field in an object (in place), creating any missing nested layers;
+            an array index past the end of an existing array is ignored
+
+        obj (dict): object to be updated
+        new_value (any): new value to be input into object
+        '''
+        parent = self._parent(obj)
+        last_key, index = self.keys[-1]
+        if index is not None:
+            array = parent[last_key]
+            if index < len(array):
+                array[index] = new_value
+        else:
+            parent[last_key] = new_value
+        return obj
+
+    def delete(self, obj):
+        '''
+        deletes the field from an object (in place), creating any missing nested layers
+
+        obj (dict): object to be updated
+        '''
+        parent = self._parent(obj)
+        last_key, index = self.keys[-1]
+        if index is not None:
+            array = parent[last_key]
+            if index < len(array):
+                del array[index]
+        else:
+            if last_key in parent:
+                del parent[last_key]
+        return obj
+
+    def updated(self, obj, new_value=None, delete=False):
+        '''
+        creates a copy of an object with the field set to new_value (or deleted), copying only the
+            object and the nested layers along the field's directory; everything else is shared
+            with obj, so neither should be changed in place afterwards
+
+        obj (dict): object to be updated
+        new_value (any): new value to be input into object (ommitted if delete=True)
+        delete (bool): if True, will delete the attribute specified by field
+        '''
+        out_obj = _shallow_copy(obj)
+        parent = out_obj
+        for key, index in self.keys[:-1]:
+            if index is not None:
+                array = _shallow_copy(parent[key]) if key in parent else []
+                parent[key] = array
+                if index >= len(array):
+                    array.extend([None] * (index + 1 - len(array)))
+                array[index] = _shallow_copy(array[index])
+                parent = array[index]
+            else:
+                parent[key] = _shallow_copy(parent[key]) if key in parent else {}
+                parent = parent[key]
+
+        last_key, index = self.keys[-1]
+        if index is not None:
+            array = _shallow_copy(parent[last_key])
+            parent[last_key] = array
+            if index < len(array):
+                if delete:
+                    del array[index]
+                else:
+                    array[index] = new_value
+        elif delete:
+            if last_key in parent:
+                del parent[last_key]
+        else:
+            parent[last_key] = new_value
+        return out_obj
+
+_missing = object()
+
+def _shallow_copy(obj):
+    # dicts and lists are by far the most common layers, so skip copy.copy's dispatch for them
+    if isinstance(obj, (dict, list)):
+        return obj.copy()
+    return copy.copy(obj)
+
+@functools.lru_cache(maxsize=1024)
+def compile_field(field):
+    '''
+    parses a field directory into a FieldPath, caching the result so that each directory is only
+        parsed once
+
+    field (string): directory of value (use "." to get to nested layers and [<ind>] to get the
+                    <ind> index of an array within an object)
+    '''
+    return FieldPath(field)
+
 def check_field(inpt_obj, field):
     '''
     checks to see if a field of an object exists, including nested fields
@@ -36,26 +228,13 @@ def check_field(inpt_obj, field):
     field (string): directory of value to be checked (use "." to get to nested layers and 
                     [<ind>] to get the <ind> index of an array within an object)
     '''
-    obj = copy.deepcopy(inpt_obj)
-    
-    keys = field.split('.')  # Split the field string by periods to get individual keys
-
-    for key in keys:
-        if key.endswith(']'):
-            array_key, index_str = key.split('[')
-            index = int(index_str[:-1])
-            if array_key not in obj or not isinstance(obj[array_key], list) or len(obj[array_key]) <= index:
-                return False
-            obj = obj[array_key][index]
-        else:
-            if key not in obj:
-                return False
-            obj = obj[key]
-    return True
+    return compile_field(field).exists(inpt_obj)
 
 def update_field_value(inpt_obj, field, new_value=None, delete=False):
     '''
-    updates a field of an object, including nested values
+    updates a field of an object, including nested values; inpt_obj is not changed, but only the
+        layers along field are copied, so the output shares everything else with inpt_obj and
+        neither should be changed in place afterwards
 
     inpt_obj (dict): object to be updated
     field (string): directory of value to be updated (use "." to get to nested layers and 
@@ -63,69 +242,18 @@ def update_field_value(inpt_obj, field, new_value=None, delete=False):
     new_value (any): new value to be input into object (ommitted if delete=True)
     delete (bool): if True, will delete the attribute specified by field
     '''
-    out_obj = copy.deepcopy(inpt_obj)
-    obj = out_obj
-    keys = field.split('.')  # Split the field string by periods to get individual keys
-    last_key = keys[-1]  # Get the last key to perform modification or deletion
-
-    for key in keys[:-1]:
-        if key.endswith(']'):  # If the key ends with ']', it indicates an array access
-            index = int(key[key.index('[') + 1: -1])  # Extract the index value from within brackets
-            array_key = key[:key.index('[')]  # Get the array key
-            if array_key not in obj:
-                obj[array_key] = []  # Create an empty list if the array key doesn't exist
-            obj = obj[array_key]  # Get the object corresponding to the array
-            if index >= len(obj):
-                obj.extend([None] * (index + 1 - len(obj)))  # Extend the list if the index is out of range
-            obj = obj[index]  # Access the specific element in the array
-        else:
-            if key not in obj:
-                obj[key] = {}  # Create an empty dictionary if the key doesn't exist
-            obj = obj[key]  # Access the object using the key
-
-    if delete:
-        if last_key.endswith(']'):
-            index = int(last_key[last_key.index('[') + 1: -1])
-            array = obj[last_key[:last_key.index('[')]]
-            if index < len(array):
-                del array[index]
-        else:
-            if last_key in obj:
-                del obj[last_key]
-    else:
-        if last_key.endswith(']'):
-            index = int(last_key[last_key.index('[') + 1: -1])
-            array = obj[last_key[:last_key.index('[')]]
-            if index < len(array):
-                array[index] = new_value
-        else:
-            obj[last_key] = new_value
-
-    return out_obj
+    return compile_field(field).updated(inpt_obj, new_value=new_value, delete=delete)
 
 def get_field_value(inpt_obj, field):
     '''
-    get value an object at specified location, including nested values
+    get value an object at specified location, including nested values; only the value found is
+        copied, so it can be changed without changing inpt_obj
 
     inpt_obj (dict): object containing value to be found
     field (string): directory of value to be found (use "." to get to nested layers and 
                     [<ind>] to get the <ind> index of an array within an object)
     '''
-    if not check_field(inpt_obj, field):
-        return None
-    
-    obj = copy.deepcopy(inpt_obj)
-    keys = field.split('.')  # Split the field string by periods to get individual keys
-
-    for key in keys:
-        if key.endswith(']'):  # If the key ends with ']', it indicates an array access
-            index = int(key[key.index('[') + 1: -1])  # Extract the index value from within brackets
-            obj = obj[key[:key.index('[')]]  # Get the object corresponding to the array
-            obj = obj[index]  # Access the specific element in the array
-        else:
-            obj = obj[key]  # Access the object using the key
-
-    return obj
+    return copy.deepcopy(compile_field(field).get(inpt_obj))
 
 def create_test_field(test_field, test_type, field_parameters, required, default, deletable, acceptable_input, array_type=None):
     '''
@@ -188,7 +316,28 @@ def update_url_id(url, ids, placeholder = '<id>'):
 
     return url
 
-def find_vals(input_obj, log, field, error_ref, delete_value=None):
+_log_sources = ['predo', 'test', 'undo']
+_log_components = ['url', 'header', 'body', 'response', 'url_ids', 'api_result', 'field_index', 'test_index', 'time', 'ttfb', 'wait']
+
+def check_reference(input_obj, error_ref):
+    '''
+    checks that a referenced value dict (see find_vals) has everything needed to find its value in
+        a log, raising a ValueError if not
+
+    input_obj (dict): referenced value dict to be checked
+    error_ref (string): string referenced to point user to key or index causing error should
+        be in the form 'for <ref>' where <ref> is either the key or index value
+    '''
+    for val in ['source', 'component', 'location']:
+        if val not in input_obj:
+            raise ValueError(f"{input_obj} missing component {val} {error_ref} (should contain ['source', 'component', 'location'])")
+    if input_obj['source'] not in _log_sources:
+        raise ValueError(f"{input_obj['source']} not found in the log {error_ref}")
+    if input_obj['component'] not in _log_components:
+        raise ValueError(f"{input_obj['component']} not found in {input_obj['source']} {error_ref} (should be one of {_log_components})")
+    return
+
+def find_vals(input_obj, log, field, error_ref, delete_value=None, checked=False):
     '''
     process a dict from the find_hb_vals or find_id_vals function
 
@@ -206,30 +355,106 @@ def find_vals(input_obj, log, field, error_ref, delete_value=None):
     field (string): current field being tested
     error_ref (string): string referenced to point user to key or index causing errorm should
         be in the form 'for <ref>' where <ref> is either the key or index value
+    checked (bool): whether input_obj has already been checked with check_reference (e.g., when
+        compiled into a template)
+
+    neither input_obj nor log are copied or changed; only the value found is copied before being
+        passed to function and returned
     '''
-    item = copy.deepcopy(input_obj)
+    item = input_obj
 
-    for val in ['source', 'component', 'location']:
-        if val not in item:
-            raise ValueError(f"{item} missing component {val} {error_ref} (should contain ['source', 'component', 'location'])")
-    if item['source'] not in log:
-        raise ValueError(f"{item['source']} not found in the log {error_ref}")
+    if not checked:
+        check_reference(item, error_ref)
     if item['component'] not in log[item['source']]:
         raise ValueError(f"{item['component']} not found in {item['source']} {error_ref}")
     location = field if item['location'] == '<field>' else item['location']
-    if not check_field(log[item['source']][item['component']], location):
+    out = compile_field(location).get(log[item['source']][item['component']], _missing)
+    if out is _missing:
         if delete_value:
             return delete_value
         else:
             raise ValueError(f"{field} (original input: {item['location']}) not found in " \
                 f"source-component {error_ref}: {log[item['source']][item['component']]}; consider " \
                 f"adding delete_value to tester")
-    out = get_field_value(log[item['source']][item['component']], location)
+    out = copy.deepcopy(out)
     if 'function' in item:
         out = item['function'](out)
     
     return out
 
+def compile_template(request_part, error_ref=''):
+    '''
+    compiles the header, body, or url_ids of a predo, test, or undo into a template that separates
+        its explicit values from the values that need to be found when the request is run
+        (referenced values and a '<field>' key); every referenced value is checked when compiled
+        so that any issues are raised before any requests are made
+
+    request_part (dict or list): header or body (dict) or url_ids (list) with either explicit
+        values or referenced values (see find_vals)
+    error_ref (string): string added to errors to point user to the request_part (e.g., 'in test
+        header')
+
+    returns a dict with the following structure:
+        static (dict or list): request_part with only its explicit values (for a dict, excluding
+            any '<field>' key)
+        slots (list): (key or index, referenced value dict or None, explicit value) for each value
+            that needs to be found when the request is run; key can be '<field>'
+        items (list): (dict only) (key, referenced value dict or None, explicit value, whether it
+            is a slot) for every key in request_part order, so rendered keys keep their order and
+            a later key still overrides an earlier one (e.g., '<field>')
+    '''
+    slots = []
+    if isinstance(request_part, list):
+        static = list(request_part)
+        for i, item in enumerate(request_part):
+            if isinstance(item, dict) and item.get('referenced_value'):
+                check_reference(item, f'for index {i} {error_ref}'.strip())
+                slots.append((i, item, None))
+        return {'static': static, 'slots': slots}
+
+    static = {}
+    items = []
+    for key, item in request_part.items():
+        ref_val = isinstance(item, dict) and item.get('referenced_value')
+        if ref_val:
+            check_reference(item, f'for {key} {error_ref}'.strip())
+        if ref_val or key == '<field>':
+            slots.append((key, item if ref_val else None, item))
+            items.append((key, item if ref_val else None, item, True))
+        else:
+            static[key] = item
+            items.append((key, None, item, False))
+    return {'static': static, 'slots': slots, 'items': items}
+
+def render_template(template, log, field, delete_value=None):
+    '''
+    creates a header, body, or url_ids from a template made by compile_template, finding only the
+        values that need to be found in the log; explicit values are shared with the template, so
+        the output should not be changed in place
+
+    template (dict): template made by compile_template
+    log (dict): a log of the previously run predo, test, undo (see find_vals)
+    field (string): current field being tested
+    delete_value (string): value to use when a referenced value cannot be found in the log
+    '''
+    if not template['slots']:
+        return template['static'].copy()
+
+    if isinstance(template['static'], list):
+        out = template['static'].copy()
+        for key, ref, value in template['slots']:
+            out[key] = find_vals(ref, log, field, f'for index {key}', checked=True)
+        return out
+
+    out = {}
+    for key, ref, value, slot in template['items']:
+        if not slot:
+            out[key] = value
+            continue
+        used_key = key if (not key == '<field>') else field
+        out[used_key] = value if ref is None else find_vals(ref, log, field, f'for {used_key}', delete_value, checked=True)
+    return out
+
 def find_hb_vals(request_obj, focus, input_log, field, delete_value=None):
     '''
     creates an output object based on either explicit values or values referenced in an
@@ -248,24 +473,15 @@ def find_hb_vals(request_obj, focus, input_log, field, delete_value=None):
         three api requests should contain body, header, url_ids, url, expected_result, api_result,
         field_index, and test_index
     field (string): current field being tested
-    '''
-    obj = copy.deepcopy(request_obj)
-    log = copy.deepcopy(input_log)
-
-    out = {}
 
+    neither request_obj nor input_log are copied or changed; referenced values are copied from the
+        log, but explicit values are shared with request_obj, so the output should not be changed
+        in place (compiles request_obj[focus] each call; see compile_template to compile once)
+    '''
     if focus not in ['header', 'body']:
         raise ValueError(f"focus value of '{focus}' not in permissible values ('header', 'body')")
 
-    for key, item in obj[focus].items():
-        used_key = key if (not key == '<field>') else field
-        ref_val = False
-        if isinstance(item, dict):
-            if 'referenced_value' in item:
-                ref_val = item['referenced_value']
-        out[used_key] = item if not ref_val else find_vals(item, log, field, f'for {used_key}', delete_value)
-
-    return out
+    return render_template(compile_template(request_obj[focus]), input_log, field, delete_value)
 
 def find_ids_vals(request_arr, input_log, field):
     '''
@@ -283,21 +499,156 @@ def find_ids_vals(request_arr, input_log, field):
     input_log (dict): a log of the previously run predo, test, undo that for each of the 
         three api requests should contain body, header, url_ids, url, expected_result, api_result,
         field_index, and test_index
+
+    neither request_arr nor input_log are copied or changed; referenced values are copied from the
+        log, but explicit values are shared with request_arr, so the output should not be changed
+        in place (compiles request_arr['url_ids'] each call; see compile_template to compile once)
+    '''
+    return render_template(compile_template(request_arr['url_ids']), input_log, field)
+
+class LogEntry(dict):
+    '''
+    A log entry of one api request (see APITester.log) whose 'response' is decoded from the
+        response only when it is first read (e.g., by a referenced value or a failure report),
+        then kept in the entry so it is never decoded twice
+
+    -- input attributes --
+    entry (dict): values of the entry; 'response' is replaced by the output of decode when read
+    decode (function): function with no inputs that returns the decoded response (None if the
+        response is already decoded)
+
+    -- methods --
+    decoded: decodes the response if it has not been, returning the entry
+    updated: creates a copy of the entry with some values changed, decoding the response only
+        when the copy's response is read
+    '''
+    __slots__ = ('_decode',)
+
+    def __init__(self, entry, decode=None):
+        super().__init__(entry)
+        self._decode = decode
+        if decode is not None:
+            dict.__setitem__(self, 'response', None)
+
+    def decoded(self):
+        '''
+        decodes the response if it has not been, returning the entry
+
+        -- inputs --
+        None
+
+        -- outputs --
+        entry (LogEntry): this entry
+        '''
+        decode = self._decode
+        if decode is not None:
+            # the value is stored before decode is cleared so other threads never see the placeholder
+            dict.__setitem__(self, 'response', decode())
+            self._decode = None
+        return self
+
+    def updated(self, **values):
+        '''
+        creates a copy of the entry with some values changed, decoding the response only when the
+            copy's response is read
+
+        -- inputs --
+        values: values to change (e.g., field_index=1)
+
+        -- outputs --
+        entry (LogEntry): copy of the entry
+        '''
+        entry = LogEntry(dict.items(self), self._decode)
+        if self._decode is None:
+            dict.__setitem__(entry, 'response', dict.__getitem__(self, 'response'))
+        dict.update(entry, values)
+        return entry
+
+    def __getitem__(self, key):
+        if key == 'response':
+            self.decoded()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if key == 'response':
+            self.decoded()
+        return dict.get(self, key, default)
+
+    def items(self):
+        return dict.items(self.decoded())
+
+    def values(self):
+        return dict.values(self.decoded())
+
+    def copy(self):
+        return dict(self.decoded())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.decoded(), other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return dict.__repr__(self.decoded())
+
+    def __reduce__(self):
+        # copies and pickles are plain dicts with the response decoded
+        return (dict, (dict(self.decoded()),))
+
+class ResponseSummary():
     '''
-    arr = copy.deepcopy(request_arr['url_ids'])
-    log = copy.deepcopy(input_log)
+    A compact stand-in for a request response kept in results in place of the full response (see
+        summarize_response) so that results do not hold every response body in memory
+
+    -- input attributes --
+    status_code (int): status code of the response
+    elapsed (datetime.timedelta): time between sending the request and receiving the response
+        (None if not provided by the response)
+    text (string): body of the response, truncated to a max length
+    truncated (bool): whether text was truncated
+    '''
+    __slots__ = ('status_code', 'elapsed', 'text', 'truncated')
 
-    out = []
+    def __init__(self, status_code, elapsed=None, text='', truncated=False):
+        self.status_code = status_code
+        self.elapsed = elapsed
+        self.text = text
+        self.truncated = truncated
 
-    for i, item in enumerate(arr):
-        ref_val = False
-        if isinstance(item, dict):
-            if 'referenced_value' in item:
-                ref_val = item['referenced_value']
-        temp_value = item if not ref_val else find_vals(item, log, field, f'for index {i}')
-        out.append(temp_value)
+    def __repr__(self):
+        return f'<ResponseSummary [{self.status_code}]>'
 
-    return out
+def summarize_response(response, body_limit=1000):
+    '''
+    creates a ResponseSummary of a request response; only the start of the body that can hold
+        body_limit characters is decoded, so large bodies are never decoded in full
+
+    response (obj): request response object (or any object with a status_code)
+    body_limit (int): max number of characters of the response body to keep (None to keep all)
+    '''
+    if isinstance(response, ResponseSummary) or response is None:
+        return response
+    content = getattr(response, 'content', None)
+    if body_limit is not None and isinstance(content, bytes):
+        # a character is at most 4 bytes; the charset of the headers is used instead of detecting it
+        head = content[:body_limit * 4]
+        text = head.decode(getattr(response, 'encoding', None) or 'utf-8', errors='replace')
+        truncated = len(text) > body_limit or len(content) > len(head)
+        return ResponseSummary(
+            response.status_code,
+            getattr(response, 'elapsed', None),
+            text[:body_limit],
+            truncated
+            )
+    text = getattr(response, 'text', '')
+    text = text if isinstance(text, str) else ''
+    truncated = body_limit is not None and len(text) > body_limit
+    return ResponseSummary(
+        response.status_code,
+        getattr(response, 'elapsed', None),
+        text[:body_limit] if truncated else text,
+        truncated
+        )
 
 def result_template(
         expected_result,
@@ -317,7 +668,19 @@ def result_template(
         undo_status = 'not run',
         undo_response = None,
         undo_json = None,
-        test_source = 'not provided'
+        test_source = 'not provided',
+        predo_status_code = None,
+        test_status_code = None,
+        undo_status_code = None,
+        predo_time = None,
+        test_time = None,
+        undo_time = None,
+        predo_ttfb = None,
+        test_ttfb = None,
+        undo_ttfb = None,
+        predo_wait = None,
+        test_wait = None,
+        undo_wait = None
         ):
     '''
     creates a dictionary output that can be included in the objects result list
@@ -339,6 +702,27 @@ def result_template(
     undo_response (dict): obj response of undo api request
     undo_json (dict): json response of undo api request
     test_source (string): which method produced ran this test
+    predo_status_code (int): status code of the predo api request (None if not run)
+    test_status_code (int): status code of the test api request (None if not run)
+    undo_status_code (int): status code of the undo api request (None if not run)
+    predo_time (float): seconds taken by the predo api request, or its last attempt if retried
+        (None if not run)
+    test_time (float): seconds taken by the test api request, or its last attempt if retried (None
+        if not run)
+    undo_time (float): seconds taken by the undo api request, or its last attempt if retried (None
+        if not run)
+    predo_ttfb (float): seconds until the predo api response headers were received (None if not
+        run or not provided by the response)
+    test_ttfb (float): seconds until the test api response headers were received (None if not run
+        or not provided by the response)
+    undo_ttfb (float): seconds until the undo api response headers were received (None if not run
+        or not provided by the response)
+    predo_wait (float): seconds the predo api request waited before its last attempt (rate limit,
+        concurrency controller, and retries) (None if not run)
+    test_wait (float): seconds the test api request waited before its last attempt (None if not
+        run)
+    undo_wait (float): seconds the undo api request waited before its last attempt (None if not
+        run)
     '''
     return {'expected_result': expected_result,
             'expected_api_success': expected_api_success,
@@ -358,4 +742,93 @@ def result_template(
             'undo_response': undo_response,
             'undo_json': undo_json,
             'test_source': test_source,
+            'predo_status_code': predo_status_code,
+            'test_status_code': test_status_code,
+            'undo_status_code': undo_status_code,
+            'predo_time': predo_time,
+            'test_time': test_time,
+            'undo_time': undo_time,
+            'predo_ttfb': predo_ttfb,
+            'test_ttfb': test_ttfb,
+            'undo_ttfb': undo_ttfb,
+            'predo_wait': predo_wait,
+            'test_wait': test_wait,
+            'undo_wait': undo_wait,
+            }
+
+def percentile(sorted_values, pct):
+    '''
+    finds a percentile of a list of values using the nearest-rank method
+
+    sorted_values (list): values sorted from smallest to largest
+    pct (float): percentile to find (0-100)
+    '''
+    if len(sorted_values) == 0:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+def status_matches(status_code, statuses):
+    '''
+    checks whether a status code is one of a list of status codes or status classes
+
+    status_code (int): status code to be checked (None never matches)
+    statuses (list): status codes (e.g., 404) and/or status classes (e.g., '4xx')
+    '''
+    if status_code is None:
+        return False
+    for status in statuses:
+        if isinstance(status, str):
+            if len(status) == 3 and status[1:].lower() == 'xx' and status[0] == str(status_code // 100):
+                return True
+        elif status == status_code:
+            return True
+    return False
+
+def case_template(
+        test_name,
+        error,
+        field,
+        test_expected_api_result,
+        test_header = None,
+        test_body = None,
+        test_url_ids = None,
+        test_url = None,
+        body_update = None,
+        test_source = 'Not Provided',
+        log_indices = (0, 0)
+        ):
+    '''
+    creates a dictionary describing one test case of a test plan (see APITester.build_plan)
+        that needs an api request; the request itself is not built until the case is run
+    test_name (string): name of the test being run
+    error (string): description of the error that will have occured if not succesful
+    field (string): name of the field being tested
+    test_expected_api_result (bool): whether the test api is expected to succeed
+    test_header (dict): header override for the test api request (None to keep test['header'])
+    test_body (dict): body override for the test api request (None to keep test['body'])
+    test_url_ids (list): url_ids override for the test api request (None to keep test['url_ids'])
+    test_url (string): url override for the test api request (None to keep test['url'])
+    body_update (dict): change to be made to a base body to create the test body when the case is
+        run (used instead of test_body) with the following form:
+        body (dict): base body to be changed (shared between cases, not to be changed in place)
+        field (string): directory of value to be changed
+        new_value (any): new value of field (ommitted if delete=True)
+        delete (bool): if True, field will be deleted instead
+        match_fields (bool): whether fields matching field should be changed too
+    test_source (string): which method produced this test
+    log_indices (tuple): (field_index, test_index) to be recorded in the log
+    '''
+    return {'kind': 'api',
+            'test_name': test_name,
+            'error': error,
+            'field': field,
+            'test_expected_api_result': test_expected_api_result,
+            'test_header': test_header,
+            'test_body': test_body,
+            'test_url_ids': test_url_ids,
+            'test_url': test_url,
+            'body_update': body_update,
+            'test_source': test_source,
+            'log_indices': log_indices,
             }